@@ -1,42 +1,53 @@
 """Flask application factory."""
 
-import logging
-
 from flask import Flask
 
 from app.config import Settings, get_settings
 from app.errors import init_error_handlers
+from app.log import configure_logging
 from app.middleware import (
+    init_admission_middleware,
+    init_asset_middleware,
+    init_caching_middleware,
+    init_compression_middleware,
+    init_fragment_middleware,
     init_logging_middleware,
+    init_metrics_middleware,
+    init_profiling_middleware,
     init_security_middleware,
     init_services_middleware,
 )
-from app.routes import health_bp, weather_bp
-
-
-def configure_logging() -> None:
-    """Configure logging for the application."""
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
+from app.routes import health_bp, metrics_bp, weather_bp
 
 
 def create_app(settings: Settings | None = None) -> Flask:
     """Create and configure the Flask application."""
-    configure_logging()
-
     if settings is None:
         settings = get_settings()
 
+    configure_logging(settings)
+
     app = Flask(__name__)
     app.config["SECRET_KEY"] = settings.secret_key
 
+    # The database engine and upstream HTTP client are created on first use,
+    # so building the app is cheap and safe before a fork (gunicorn --preload)
+
     # Initialize middleware
-    init_logging_middleware(app)
+    init_logging_middleware(app, settings)
+    if settings.metrics_enabled:
+        init_metrics_middleware(app)
+    if settings.db_profiling:
+        init_profiling_middleware(app, settings)
     init_security_middleware(app)
+    init_admission_middleware(app, settings)
+    # Registered before caching so it runs after it, on the final body
+    if settings.compression_enabled:
+        init_compression_middleware(app, settings)
+    init_caching_middleware(app, settings)
     init_services_middleware(app, settings)
+    init_fragment_middleware(app, settings)
+    init_asset_middleware(app)
 
     # Initialize error handlers
     init_error_handlers(app)
@@ -44,5 +55,7 @@ def create_app(settings: Settings | None = None) -> Flask:
     # Register blueprints
     app.register_blueprint(health_bp)
     app.register_blueprint(weather_bp)
+    if settings.metrics_enabled:
+        app.register_blueprint(metrics_bp)
 
     return app
@@ -1,6 +1,7 @@
 """Application configuration using Pydantic Settings."""
 
 from functools import lru_cache
+from typing import Literal
 
 from pydantic import computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -21,7 +22,72 @@ class Settings(BaseSettings):
 
     # Weather API
     weather_api_url: str = "https://api.open-meteo.com/v1"
+    weather_archive_url: str = "https://archive-api.open-meteo.com/v1"
     weather_api_timeout: int = 10
+    weather_api_max_connections: int = 20
+    weather_api_max_keepalive: int = 10
+    weather_api_keepalive_expiry: float = 30.0
+    weather_api_http2: bool = False
+    weather_api_batch_size: int = 100
+
+    # Weather API resilience
+    weather_api_retries: int = 2
+    weather_api_retry_backoff: float = 0.1
+    weather_api_retry_backoff_max: float = 1.0
+    weather_api_circuit_threshold: int = 5
+    weather_api_circuit_reset: float = 30.0
+    weather_api_slow_call: float = 5.0
+    weather_api_hedge: bool = False
+
+    # Weather cache
+    weather_cache_ttl: int = 300
+    weather_cache_max_size: int = 1024
+    weather_cache_precision: int = 2
+    weather_cache_max_stale: int = 900
+    weather_cache_max_fallback_age: int = 3600
+    weather_cache_backend: Literal["memory", "mmap", "redis"] = "memory"
+    weather_cache_redis_url: str = "redis://localhost:6379/0"
+    weather_cache_mmap_dir: str = ""
+    weather_refresh_interval: int = 240
+    weather_history_enabled: bool = True
+
+    # Live weather stream (server-sent events)
+    weather_stream_max_clients: int = 48
+    weather_stream_heartbeat: int = 15
+
+    # Reference data (cities, weather codes) snapshot
+    reference_data_refresh_interval: int = 60
+
+    # Rendered template fragments (city select, weather card)
+    template_fragment_cache_size: int = 256
+
+    # Response compression (gzip, brotli with the 'brotli' extra)
+    compression_enabled: bool = True
+    compression_min_size: int = 1024
+
+    # Admission control for routes that call Open-Meteo
+    rate_limit_per_minute: int = 0
+    rate_limit_burst: int = 20
+    rate_limit_backend: Literal["memory", "redis"] = "memory"
+    rate_limit_redis_url: str = "redis://localhost:6379/0"
+    admission_max_in_flight: int = 32
+    admission_max_queue: int = 16
+    admission_queue_timeout: float = 2.0
+    proxy_count: int = 0
+
+    # Logging (records are written to stderr by a background thread)
+    log_level: str = "INFO"
+    log_format: Literal["text", "json"] = "text"
+    log_queue_size: int = 10000
+    log_sample_rate: float = 1.0
+    log_sample_threshold: int = 100
+
+    # Metrics
+    metrics_enabled: bool = True
+
+    # Per-request SQL profiling (development)
+    db_profiling: bool = False
+    db_query_budget: int = 5
 
     # Database (using PG* environment variables)
     pghost: str = "localhost"
@@ -30,6 +96,15 @@ class Settings(BaseSettings):
     pgpassword: str = "postgres"
     pgdatabase: str = "czech_weather"
 
+    # Connection pool
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_timeout: int = 5000
+    db_prepare_threshold: int = 5
+
     @computed_field  # type: ignore[prop-decorator]
     @property
     def database_url(self) -> str:
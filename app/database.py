@@ -1,16 +1,94 @@
 """Database engine and session management."""
 
-from collections.abc import Generator
+import os
+import threading
+from collections.abc import Callable, Generator
+from typing import Any
 
 from sqlalchemy import Engine
 from sqlmodel import Session, create_engine
 
 from app.config import Settings
 
+_engines: dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+_engine_hooks: list[Callable[[Engine], None]] = []
+
+
+def on_engine_created(hook: Callable[[Engine], None]) -> None:
+    """
+    Run hook on every engine get_engine creates, including existing ones.
+
+    Used to attach event listeners to the app's engines only (not e.g.
+    Alembic's). Registering the same hook again is a no-op, so building
+    several apps in one process doesn't attach listeners twice.
+    """
+    with _engines_lock:
+        if hook in _engine_hooks:
+            return
+        _engine_hooks.append(hook)
+        engines = list(_engines.values())
+    for engine in engines:
+        hook(engine)
+
 
 def get_engine(settings: Settings) -> Engine:
-    """Create database engine from settings."""
-    return create_engine(settings.database_url, echo=settings.debug)
+    """
+    Get the process-wide database engine, creating it on first use.
+
+    One engine (and so one connection pool) is shared per database URL, with
+    pool size, overflow, pre-ping, recycling and statement timeout taken from
+    settings.
+    """
+    url = settings.database_url
+    engine = _engines.get(url)
+    if engine is not None:
+        return engine
+
+    with _engines_lock:
+        if url not in _engines:
+            engine = create_engine(
+                url,
+                echo=settings.debug,
+                pool_size=settings.db_pool_size,
+                max_overflow=settings.db_max_overflow,
+                pool_timeout=settings.db_pool_timeout,
+                pool_recycle=settings.db_pool_recycle,
+                pool_pre_ping=settings.db_pool_pre_ping,
+                connect_args=_connect_args(settings),
+            )
+            for hook in _engine_hooks:
+                hook(engine)
+            _engines[url] = engine
+        return _engines[url]
+
+
+def _dispose_after_fork() -> None:
+    """
+    Drop pooled connections inherited from the parent process.
+
+    With ``gunicorn --preload`` workers are forked from a master that may
+    already have connected; a child must open its own connections rather
+    than share the parent's sockets. ``close=False`` leaves the parent's
+    connections open for the parent.
+    """
+    global _engines_lock
+    _engines_lock = threading.Lock()
+    for engine in _engines.values():
+        engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_dispose_after_fork)
+
+
+def _connect_args(settings: Settings) -> dict[str, Any]:
+    """Build psycopg connection arguments from settings."""
+    # psycopg prepares a statement server-side after it has run this many
+    # times on a connection; 0 disables it (e.g. behind PgBouncer).
+    args: dict[str, Any] = {"prepare_threshold": settings.db_prepare_threshold or None}
+    if settings.db_statement_timeout > 0:
+        args["options"] = f"-c statement_timeout={settings.db_statement_timeout}"
+    return args
 
 
 def get_session(settings: Settings) -> Generator[Session, None, None]:
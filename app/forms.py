@@ -2,11 +2,15 @@
 
 from typing import Any
 
-from flask import g
+from flask import current_app, g
 from flask_wtf import FlaskForm
+from markupsafe import Markup
 from wtforms import SelectField
+from wtforms.fields.choices import SelectFieldBase
 from wtforms.validators import DataRequired, ValidationError
+from wtforms.widgets import Select, html_params
 
+from app.services.cache import TTLCache
 from app.services.repository import Repository
 
 
@@ -24,10 +28,52 @@ class CityValidator:
             raise ValidationError(self.message)
 
 
+class CachedSelect(Select):
+    """
+    Select widget that renders the option list once per choices version.
+
+    The field's ``choices_version`` identifies its choices (see
+    ``VersionedSelectField``). The select is rendered without a selection
+    and cached in the fragment cache; the selected option is then marked
+    with a single string replacement.
+    """
+
+    def __call__(self, field: SelectFieldBase, **kwargs: Any) -> Markup:
+        cache: TTLCache[Markup] | None = current_app.extensions.get("fragment_cache")
+        version = getattr(field, "choices_version", None)
+        if cache is None or version is None:
+            return super().__call__(field, **kwargs)
+
+        key = ("select", field.name, version, tuple(sorted(kwargs.items())))
+        html = cache.get_or_load(key, lambda: self._render_unselected(field, kwargs))
+        if not field.data:
+            return html
+        plain = f"<option {html_params(value=field.data)}>"
+        selected = f"<option {html_params(selected=True, value=field.data)}>"
+        # Markup.replace would escape the arguments, so splice the plain string
+        return Markup(str(html).replace(plain, selected, 1))
+
+    def _render_unselected(
+        self, field: SelectFieldBase, kwargs: dict[str, Any]
+    ) -> Markup:
+        data, field.data = field.data, None
+        try:
+            return super().__call__(field, **kwargs)
+        finally:
+            field.data = data
+
+
+class VersionedSelectField(SelectField):
+    """Select field whose choices are identified by a version string."""
+
+    widget = CachedSelect()
+    choices_version: str | None = None
+
+
 class CityForm(FlaskForm):  # type: ignore[misc]
     """Form for selecting a Czech city."""
 
-    city = SelectField(
+    city = VersionedSelectField(
         "City",
         validators=[
             DataRequired(message="Please select a city."),
@@ -40,3 +86,4 @@ class CityForm(FlaskForm):  # type: ignore[misc]
         repository: Repository = g.repository
         cities = repository.get_all_cities()
         self.city.choices = [(c.name, c.name) for c in cities]
+        self.city.choices_version = repository.get_reference_version()
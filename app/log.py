@@ -0,0 +1,161 @@
+"""Logging setup: text or JSON records written by a background thread."""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+
+from app.config import Settings
+
+TEXT_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+TEXT_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+RECORD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None)).keys()
+    | {"message", "asctime", "taskName"}
+)
+
+_listener: QueueListener | None = None
+_lock = threading.Lock()
+
+
+def record_extra(record: logging.LogRecord) -> dict[str, object]:
+    """Fields attached to a record with ``extra``."""
+    return {
+        key: value
+        for key, value in vars(record).items()
+        if key not in RECORD_ATTRIBUTES and not key.startswith("_")
+    }
+
+
+class TextFormatter(logging.Formatter):
+    """The usual one-line format, followed by the record's extra fields."""
+
+    def __init__(self) -> None:
+        super().__init__(TEXT_FORMAT, TEXT_DATE_FORMAT)
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extra = record_extra(record)
+        if not extra:
+            return line
+        fields = " ".join(f"{key}={value}" for key, value in extra.items())
+        head, newline, rest = line.partition("\n")
+        return f"{head} | {fields}{newline}{rest}"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the record's extra fields at top level."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, object] = {
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **record_extra(record),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """
+    Hand records to the listener thread without formatting them.
+
+    The stock ``prepare`` runs the formatter on the calling thread; here
+    only the message is merged (so later changes to the arguments don't
+    leak into the log) and JSON encoding, timestamps and tracebacks are left
+    to the listener. When the queue is full the record is dropped and
+    counted rather than blocking the request.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(settings: Settings) -> None:
+    """
+    Send log records through a queue to a stderr writer thread.
+
+    Safe to call more than once (e.g. one app per test); only the first
+    call installs the handler. The listener is stopped, flushing what is
+    queued, when the process exits and around forks, and each forked child
+    (such as a gunicorn worker) runs its own.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+        formatter: logging.Formatter = (
+            JsonFormatter() if settings.log_format == "json" else TextFormatter()
+        )
+        stream = logging.StreamHandler(sys.stderr)
+        stream.setFormatter(formatter)
+        handler = BackgroundQueueHandler(queue.Queue(settings.log_queue_size))
+
+        root = logging.getLogger()
+        root.setLevel(settings.log_level.upper())
+        root.addHandler(handler)
+        _listener = QueueListener(handler.queue, stream, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_stop_listener)
+
+
+def _stop_listener() -> None:
+    """Write out queued records and stop the listener thread."""
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+def _pause_before_fork() -> None:
+    """
+    Drain the queue and stop the listener so no thread runs across a fork.
+
+    A thread holding the queue or stream lock while the process forks would
+    leave the child's copy of that lock locked forever.
+    """
+    _stop_listener()
+
+
+def _resume_after_fork() -> None:
+    """Restart the listener in the parent, and start a fresh one in the child."""
+    if _listener is not None and _listener._thread is None:
+        _listener.start()
+
+
+def _reset_after_fork() -> None:
+    """Give the child its own lock and start its listener."""
+    global _lock
+    _lock = threading.Lock()
+    _resume_after_fork()
+
+
+os.register_at_fork(
+    before=_pause_before_fork,
+    after_in_parent=_resume_after_fork,
+    after_in_child=_reset_after_fork,
+)
@@ -0,0 +1,112 @@
+"""Prometheus metrics shared across the application.
+
+When ``PROMETHEUS_MULTIPROC_DIR`` is set (as under gunicorn, see
+``gunicorn.conf.py``) every worker writes its samples to memory-mapped files
+in that directory and ``/metrics`` aggregates them across workers.
+"""
+
+import os
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    multiprocess,
+)
+
+# Multiprocess metrics create their files on definition, i.e. on import
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+if MULTIPROC_DIR:
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by endpoint.",
+    ["method", "endpoint", "status"],
+)
+
+UPSTREAM_LATENCY = Histogram(
+    "weather_api_request_duration_seconds",
+    "Open-Meteo request latency by operation.",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+UPSTREAM_ERRORS = Counter(
+    "weather_api_errors_total",
+    "Failed Open-Meteo requests by operation and reason.",
+    ["operation", "reason"],
+)
+
+UPSTREAM_RETRIES = Counter(
+    "weather_api_retries_total",
+    "Extra Open-Meteo requests by kind (retry, hedge).",
+    ["kind"],
+)
+
+CIRCUIT_STATE = Gauge(
+    "weather_api_circuit_state",
+    "Circuit breaker state (0 closed, 1 half-open, 2 open).",
+    ["circuit"],
+    multiprocess_mode="max",
+)
+
+STREAM_CLIENTS = Gauge(
+    "weather_stream_clients",
+    "Clients connected to the live weather stream.",
+    multiprocess_mode="livesum",
+)
+
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "Database statements executed per HTTP request.",
+    ["endpoint"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50),
+)
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Database statement execution time.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0),
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result (hit, miss, coalesced, stale, fallback).",
+    ["cache", "result"],
+)
+
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total",
+    "Requests (rate_limited) and upstream calls (overloaded) turned away.",
+    ["reason"],
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight",
+    "Upstream calls currently holding an admission slot.",
+    multiprocess_mode="livesum",
+)
+
+ADMISSION_QUEUED = Gauge(
+    "admission_queued",
+    "Upstream calls waiting for an admission slot.",
+    multiprocess_mode="livesum",
+)
+
+ADMISSION_QUEUE_WAIT = Histogram(
+    "admission_queue_wait_seconds",
+    "Time upstream calls waited for an admission slot.",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+
+def get_registry() -> CollectorRegistry:
+    """Return the registry to expose, aggregating workers in multiprocess mode."""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+    return registry
@@ -1,13 +1,34 @@
 """Middleware for request/response processing."""
 
+from app.middleware.admission import admission_controlled, init_admission_middleware
+from app.middleware.assets import init_asset_middleware
+from app.middleware.caching import http_cache, init_caching_middleware, limit_max_age
+from app.middleware.compression import init_compression_middleware
+from app.middleware.fragments import init_fragment_middleware
 from app.middleware.logging import init_logging_middleware
+from app.middleware.metrics import init_metrics_middleware
+from app.middleware.profiling import init_profiling_middleware
 from app.middleware.security import init_security_middleware
-from app.middleware.services import init_services_middleware
+from app.middleware.services import (
+    init_services_middleware,
+    start_background_services,
+)
 from app.middleware.validation import validate_form
 
 __all__ = [
+    "admission_controlled",
+    "http_cache",
+    "init_admission_middleware",
+    "init_asset_middleware",
+    "init_caching_middleware",
+    "init_compression_middleware",
+    "init_fragment_middleware",
     "init_logging_middleware",
+    "init_metrics_middleware",
+    "init_profiling_middleware",
     "init_security_middleware",
     "init_services_middleware",
+    "limit_max_age",
+    "start_background_services",
     "validate_form",
 ]
@@ -0,0 +1,100 @@
+"""Admission control for routes that wait on the upstream weather API."""
+
+import logging
+import math
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from flask import (
+    Flask,
+    Response,
+    current_app,
+    jsonify,
+    make_response,
+    render_template,
+    request,
+)
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from app.config import Settings
+from app.metrics import ADMISSION_REJECTED
+from app.services import UpstreamBusyError, create_rate_limiter
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+logger = logging.getLogger(__name__)
+
+
+def admission_controlled(f: F) -> F:
+    """
+    Decorator that puts a view under per-client rate limiting.
+
+    Each client gets a token bucket of requests (429 with ``Retry-After``
+    when empty). The cap on concurrent Open-Meteo calls is applied by the
+    weather service around each call, so cache hits are never queued.
+    """
+    f.admission_controlled = True  # type: ignore[attr-defined]
+    return f
+
+
+def client_key() -> str:
+    """Identify the client; the real address when PROXY_COUNT is set."""
+    return request.remote_addr or "unknown"
+
+
+def reject(status: int, retry_after: float, message: str) -> Response:
+    """Short error response: JSON for the API, a page for the form."""
+    if request.path.startswith("/api/"):
+        response = jsonify({"error": message})
+    else:
+        response = make_response(
+            render_template(f"errors/{status}.html", message=message)
+        )
+    response.status_code = status
+    response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def init_admission_middleware(app: Flask, settings: Settings) -> None:
+    """
+    Initialize per-client rate limiting, and answer shed upstream calls.
+
+    An UpstreamBusyError that reaches Flask (the weather service had no last
+    known good value to serve instead) becomes a 503 with ``Retry-After``.
+    """
+    if settings.proxy_count > 0:
+        # Trust X-Forwarded-For from that many proxies, so clients behind a
+        # load balancer are told apart by their own address
+        app.wsgi_app = ProxyFix(  # type: ignore[method-assign]
+            app.wsgi_app, x_for=settings.proxy_count
+        )
+
+    rate_limiter = create_rate_limiter(settings)
+    if rate_limiter is not None and settings.proxy_count == 0:
+        logger.warning(
+            "Rate limiting by connection address with PROXY_COUNT=0; behind a "
+            "load balancer every client shares one bucket"
+        )
+
+    @app.before_request
+    def admit_request() -> Response | None:
+        """Reject clients over their rate limit."""
+        if request.endpoint is None:
+            return None
+        view = current_app.view_functions.get(request.endpoint)
+        if not getattr(view, "admission_controlled", False):
+            return None
+
+        if rate_limiter is not None:
+            wait = rate_limiter.take(client_key())
+            if wait > 0:
+                ADMISSION_REJECTED.labels("rate_limited").inc()
+                return reject(429, wait, "Too many requests, slow down.")
+        return None
+
+    @app.errorhandler(UpstreamBusyError)
+    def upstream_busy(error: UpstreamBusyError) -> Response:
+        """Shed request: the worker already has its cap of upstream calls."""
+        return reject(
+            503, error.retry_after, "The server is busy, please try again shortly."
+        )
@@ -0,0 +1,130 @@
+"""Fingerprinted, precompressed static assets."""
+
+import hashlib
+import mimetypes
+from dataclasses import dataclass
+from pathlib import Path
+
+from flask import Flask, Response, current_app, request, url_for
+
+from app.middleware.compression import (
+    COMPRESSIBLE_TYPES,
+    available_encodings,
+    compressor,
+    negotiate_encoding,
+)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    """A static file read at startup, with its compressed variants."""
+
+    filename: str
+    hashed_name: str
+    mimetype: str
+    etag: str
+    variants: dict[str, bytes]
+
+
+def hashed_filename(filename: str, digest: str) -> str:
+    """Insert a content hash before the extension: css/style.<hash>.css."""
+    path = Path(filename)
+    return str(path.with_name(f"{path.stem}.{digest}{path.suffix}"))
+
+
+class AssetManifest:
+    """
+    Static files keyed by both their plain and content-hashed names.
+
+    Files are read and compressed once, at the highest level, when the app
+    is created; variants that do not come out smaller are dropped.
+    """
+
+    def __init__(self, folder: Path) -> None:
+        self._assets: dict[str, StaticAsset] = {}
+        self._hashed: dict[str, StaticAsset] = {}
+        encodings = available_encodings()
+        for path in sorted(p for p in folder.rglob("*") if p.is_file()):
+            filename = path.relative_to(folder).as_posix()
+            data = path.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            variants = {"identity": data}
+            if mimetype in COMPRESSIBLE_TYPES:
+                for encoding in encodings:
+                    compressed = compressor(encoding, best=True)(data)
+                    if len(compressed) < len(data):
+                        variants[encoding] = compressed
+            asset = StaticAsset(
+                filename, hashed_filename(filename, digest), mimetype, digest, variants
+            )
+            self._assets[filename] = asset
+            self._hashed[asset.hashed_name] = asset
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+    def url_name(self, filename: str) -> str:
+        """Hashed name for a known file, the name itself otherwise."""
+        asset = self._assets.get(filename)
+        return filename if asset is None else asset.hashed_name
+
+    def lookup(self, name: str) -> tuple[StaticAsset, bool] | None:
+        """Find an asset by hashed or plain name; the flag is True if hashed."""
+        if name in self._hashed:
+            return self._hashed[name], True
+        if name in self._assets:
+            return self._assets[name], False
+        return None
+
+
+def asset_url(filename: str) -> str:
+    """URL of a static file under its content-hashed name, for templates."""
+    manifest: AssetManifest = current_app.extensions["assets"]
+    return url_for("static", filename=manifest.url_name(filename))
+
+
+def init_asset_middleware(app: Flask) -> None:
+    """
+    Serve static files from memory, fingerprinted and precompressed.
+
+    Templates link assets with ``asset_url('css/style.css')``, which points
+    at ``css/style.<hash>.css``; such URLs change whenever the content does,
+    so they are cached for a year as immutable. Plain names keep working
+    with revalidation through the ETag. Files added after startup fall back
+    to Flask's own static view.
+    """
+    if app.static_folder is None:
+        return
+    manifest = AssetManifest(Path(app.static_folder))
+    app.extensions["assets"] = manifest
+    app.jinja_env.globals["asset_url"] = asset_url
+    encodings = available_encodings()
+
+    def static(filename: str) -> Response:
+        found = manifest.lookup(filename)
+        if found is None:
+            return app.send_static_file(filename)
+        asset, hashed = found
+
+        encoding = negotiate_encoding(
+            tuple(e for e in encodings if e in asset.variants)
+        )
+        response = Response(
+            asset.variants[encoding or "identity"], mimetype=asset.mimetype
+        )
+        if encoding is not None:
+            response.headers["Content-Encoding"] = encoding
+        if len(asset.variants) > 1:
+            response.vary.add("Accept-Encoding")
+        # Each encoding is a different representation with its own ETag
+        response.set_etag(
+            asset.etag if encoding is None else f"{asset.etag}-{encoding}"
+        )
+        response.headers["Cache-Control"] = IMMUTABLE if hashed else "no-cache"
+        response.make_conditional(request)
+        return response
+
+    app.view_functions["static"] = static
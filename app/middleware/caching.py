@@ -0,0 +1,127 @@
+"""HTTP caching middleware for conditional responses and Cache-Control."""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from flask import Flask, Response, current_app, g, request
+
+from app.config import Settings
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+SettingsValue = Callable[[Settings], int]
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Caching rules attached to a view by the ``http_cache`` decorator."""
+
+    max_age: SettingsValue
+    stale_while_revalidate: SettingsValue | None = None
+    etag: Callable[[], str] | None = None
+
+
+def http_cache(
+    max_age: SettingsValue,
+    stale_while_revalidate: SettingsValue | None = None,
+    etag: Callable[[], str] | None = None,
+) -> Callable[[F], F]:
+    """
+    Decorator that marks a GET view as publicly cacheable.
+
+    Args:
+        max_age: Returns ``max-age`` seconds from settings
+        stale_while_revalidate: Returns ``stale-while-revalidate`` seconds
+        etag: Returns a strong ETag computed without running the view, so a
+            matching ``If-None-Match`` is answered with 304 before any work
+            is done; without it the view may set its own ETag, and otherwise
+            the ETag is a hash of the response body
+
+    Views can lower ``max-age`` per response with ``limit_max_age``.
+
+    Returns:
+        The view, unchanged apart from the attached policy
+    """
+
+    def decorator(f: F) -> F:
+        f.cache_policy = CachePolicy(  # type: ignore[attr-defined]
+            max_age=max_age,
+            stale_while_revalidate=stale_while_revalidate,
+            etag=etag,
+        )
+        return f
+
+    return decorator
+
+
+def limit_max_age(seconds: float) -> None:
+    """
+    Cap ``max-age`` of the current response, e.g. to the remaining lifetime
+    of the data it was built from.
+
+    Below one second the response is sent with ``no-store`` instead, so
+    errors and stale or fallback data are never cached downstream. Several
+    calls keep the lowest limit.
+    """
+    g.cache_max_age = min(seconds, g.get("cache_max_age", seconds))
+
+
+def init_caching_middleware(app: Flask, settings: Settings) -> None:
+    """Initialize caching middleware with ETag and Cache-Control handling."""
+
+    def current_policy() -> CachePolicy | None:
+        if request.method not in ("GET", "HEAD") or request.endpoint is None:
+            return None
+        view = current_app.view_functions.get(request.endpoint)
+        return getattr(view, "cache_policy", None)
+
+    def cache_control(policy: CachePolicy) -> str:
+        max_age = policy.max_age(settings)
+        limit: float | None = g.get("cache_max_age")
+        if limit is not None:
+            if limit < 1:
+                return "no-store"
+            max_age = min(max_age, int(limit))
+        directives = f"public, max-age={max_age}"
+        if policy.stale_while_revalidate is not None:
+            swr = policy.stale_while_revalidate(settings)
+            directives += f", stale-while-revalidate={swr}"
+        return directives
+
+    @app.before_request
+    def short_circuit_not_modified() -> Response | None:
+        """Answer 304 for a matching version ETag before running the view."""
+        policy = current_policy()
+        if policy is None or policy.etag is None:
+            return None
+
+        etag = policy.etag()
+        # Weak comparison: compression turns the ETag sent to clients weak
+        if not request.if_none_match.contains_weak(etag):
+            return None
+
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = cache_control(policy)
+        return response
+
+    @app.after_request
+    def add_cache_headers(response: Response) -> Response:
+        """Add ETag and Cache-Control to cacheable successful responses."""
+        policy = current_policy()
+        if policy is None or response.status_code != 200:
+            return response
+
+        response.headers["Cache-Control"] = cache_control(policy)
+        if response.headers["Cache-Control"] == "no-store":
+            # Nothing to revalidate against
+            response.headers.pop("ETag", None)
+            return response
+
+        if policy.etag is not None:
+            response.set_etag(policy.etag())
+        elif "ETag" not in response.headers:
+            response.add_etag()
+        response.make_conditional(request)
+        return response
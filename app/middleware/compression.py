@@ -0,0 +1,101 @@
+"""Response compression with gzip, or brotli when the extra is installed."""
+
+import gzip
+from collections.abc import Callable
+from types import ModuleType
+
+from flask import Flask, Response, request
+
+from app.config import Settings
+
+COMPRESSIBLE_TYPES = frozenset(
+    {
+        "application/javascript",
+        "application/json",
+        "image/svg+xml",
+        "text/css",
+        "text/html",
+        "text/javascript",
+        "text/plain",
+    }
+)
+
+# Dynamic responses favour speed; static assets are compressed once at the
+# highest level when the app starts
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def load_brotli() -> ModuleType | None:
+    """Return the brotli module, or None without the 'brotli' extra."""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli  # type: ignore[no-any-return]
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Content codings this process can produce, preferred first."""
+    return ("br", "gzip") if load_brotli() is not None else ("gzip",)
+
+
+def compressor(encoding: str, best: bool = False) -> Callable[[bytes], bytes]:
+    """Return a function compressing bytes with the given content coding."""
+    if encoding == "br":
+        brotli = load_brotli()
+        if brotli is None:
+            raise RuntimeError("brotli compression requires the 'brotli' extra")
+        quality = 11 if best else BROTLI_QUALITY
+        return lambda data: brotli.compress(data, quality=quality)
+    level = 9 if best else GZIP_LEVEL
+    # mtime=0 keeps the output, and so the ETag, stable across runs
+    return lambda data: gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def negotiate_encoding(encodings: tuple[str, ...]) -> str | None:
+    """Pick the coding the client accepts best, or None for identity."""
+    return request.accept_encodings.best_match(encodings)
+
+
+def init_compression_middleware(app: Flask, settings: Settings) -> None:
+    """
+    Compress HTML and JSON responses above ``compression_min_size`` bytes.
+
+    Brotli is used when the 'brotli' extra is installed and the client
+    accepts it, gzip otherwise. Streamed responses (the SSE feed, static
+    files) are left alone. Register this before the caching middleware so
+    it runs after the ETag is set: the ETag is then weakened, as the
+    compressed body is no longer byte-identical to what it was computed on.
+    """
+    min_size = settings.compression_min_size
+    encodings = available_encodings()
+    compressors = {encoding: compressor(encoding) for encoding in encodings}
+
+    @app.after_request
+    def compress_response(response: Response) -> Response:
+        """Compress the body when the client and the response allow it."""
+        response.vary.add("Accept-Encoding")
+        if (
+            response.status_code != 200
+            or request.method == "HEAD"
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES
+        ):
+            return response
+
+        encoding = negotiate_encoding(encodings)
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        response.set_data(compressors[encoding](data))
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag is not None and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,45 @@
+"""Cache for rendered template fragments."""
+
+import math
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from flask import Flask, current_app, g
+from markupsafe import Markup
+
+from app.config import Settings
+from app.services import Repository, TTLCache
+
+
+def cached_fragment(key: Hashable, render: Callable[..., str], *args: Any) -> Markup:
+    """
+    Render a fragment once per key and reuse the markup afterwards.
+
+    Called from templates with a macro as ``render``; the key must capture
+    everything the fragment depends on (e.g. the reference data version).
+    Per-request values such as CSRF tokens must stay outside the fragment.
+    """
+    cache: TTLCache[Markup] | None = current_app.extensions["fragment_cache"]
+    if cache is None:
+        return Markup(render(*args))
+    return cache.get_or_load(key, lambda: Markup(render(*args)))
+
+
+def reference_version() -> str:
+    """Reference data version of the current request, for fragment keys."""
+    repository: Repository = g.repository
+    return repository.get_reference_version()
+
+
+def init_fragment_middleware(app: Flask, settings: Settings) -> None:
+    """Initialize the fragment cache and its template helpers."""
+    fragment_cache: TTLCache[Markup] | None = None
+    if settings.template_fragment_cache_size > 0:
+        # Keys include the versions they depend on, so entries never expire
+        fragment_cache = TTLCache(
+            "fragments", ttl=math.inf, max_size=settings.template_fragment_cache_size
+        )
+    app.extensions["fragment_cache"] = fragment_cache
+
+    app.jinja_env.globals["cached_fragment"] = cached_fragment
+    app.jinja_env.globals["reference_version"] = reference_version
@@ -1,16 +1,54 @@
 """Logging middleware for request tracking."""
 
 import logging
+import random
+import threading
 import time
 import uuid
 
 from flask import Flask, Response, g, request
 
+from app.config import Settings
+
 logger = logging.getLogger(__name__)
 
+# Requests slower than this are always logged, even when sampling
+SLOW_REQUEST_MS = 1000.0
+
+
+class RequestSampler:
+    """
+    Decide which completed requests to log.
+
+    Below ``threshold`` requests per second (per process) everything is
+    logged. Above it, successful requests are logged with probability
+    ``rate``; errors, client errors and slow requests are always kept.
+    """
+
+    def __init__(self, rate: float, threshold: int) -> None:
+        self.rate = rate
+        self.threshold = threshold
+        self._second = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def sample_rate(self, status: int, duration_ms: float) -> float | None:
+        """Return the rate the request was sampled at, or None to skip it."""
+        with self._lock:
+            second = int(time.monotonic())
+            if second != self._second:
+                self._second = second
+                self._count = 0
+            self._count += 1
+            busy = self._count > self.threshold
+        if not busy or status >= 400 or duration_ms >= SLOW_REQUEST_MS:
+            return 1.0
+        return self.rate if random.random() < self.rate else None
 
-def init_logging_middleware(app: Flask) -> None:
+
+def init_logging_middleware(app: Flask, settings: Settings) -> None:
     """Initialize logging middleware with request tracking."""
+    sampler = RequestSampler(settings.log_sample_rate, settings.log_sample_threshold)
 
     @app.before_request
     def before_request() -> None:
@@ -21,7 +59,14 @@ def init_logging_middleware(app: Flask) -> None:
     @app.after_request
     def after_request(response: Response) -> Response:
         """Log request details and add request ID header."""
+        response.headers["X-Request-ID"] = g.request_id
+        if not logger.isEnabledFor(logging.INFO):
+            return response
+
         duration_ms = (time.perf_counter() - g.start_time) * 1000
+        rate = sampler.sample_rate(response.status_code, duration_ms)
+        if rate is None:
+            return response
 
         logger.info(
             "Request completed",
@@ -31,8 +76,8 @@ def init_logging_middleware(app: Flask) -> None:
                 "path": request.path,
                 "status": response.status_code,
                 "duration_ms": round(duration_ms, 2),
+                # Lets log queries weight sampled lines (count / sample_rate)
+                "sample_rate": rate,
             },
         )
-
-        response.headers["X-Request-ID"] = g.request_id
         return response
@@ -0,0 +1,60 @@
+"""Metrics middleware for request and database instrumentation."""
+
+import time
+from typing import Any
+
+from flask import Flask, Response, g, has_request_context, request
+from sqlalchemy import Engine, event
+
+from app.database import on_engine_created
+from app.metrics import DB_QUERIES_PER_REQUEST, DB_QUERY_DURATION, REQUEST_LATENCY
+
+
+def before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+) -> None:
+    """Stamp the statement's start on its execution context."""
+    context._metrics_start = time.perf_counter()
+
+
+def after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+) -> None:
+    """Record the statement's duration and count it against the request."""
+    # Kept on the context rather than the connection, so a statement that
+    # raises (and never gets here) leaves nothing behind
+    DB_QUERY_DURATION.observe(time.perf_counter() - context._metrics_start)
+    if has_request_context():
+        g.db_query_count = g.get("db_query_count", 0) + 1
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach the query timing listeners to an engine, once."""
+    if not event.contains(engine, "before_cursor_execute", before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+def init_metrics_middleware(app: Flask) -> None:
+    """Initialize metrics middleware with request and query timing."""
+    # The engine is created on first use; the hook also covers that one
+    on_engine_created(instrument_engine)
+
+    @app.before_request
+    def start_timer() -> None:
+        """Record request start time for the latency histogram."""
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response: Response) -> Response:
+        """Record request latency and database query count."""
+        start: float | None = g.get("metrics_start")
+        if start is None:
+            return response
+
+        endpoint = request.endpoint or "unknown"
+        REQUEST_LATENCY.labels(request.method, endpoint, response.status_code).observe(
+            time.perf_counter() - start
+        )
+        DB_QUERIES_PER_REQUEST.labels(endpoint).observe(g.get("db_query_count", 0))
+        return response
@@ -0,0 +1,129 @@
+"""Per-request SQL profiling for development and debugging."""
+
+import logging
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from flask import Flask, Response, g, has_request_context, request
+from sqlalchemy import Engine, event
+
+from app.config import Settings
+from app.database import on_engine_created
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = str(Path(__file__).resolve().parent.parent)
+
+
+@dataclass(frozen=True)
+class QueryRecord:
+    """One statement executed while handling a request."""
+
+    statement: str
+    duration: float
+    call_site: str
+
+
+def call_site(depth: int = 2) -> str:
+    """
+    Describe the innermost app frames that led to the current statement.
+
+    Frames in SQLAlchemy, Flask and this module are skipped, so the result
+    points at the repository method and the form or route that called it,
+    e.g. ``app/services/repository.py:98 in get_city_by_name <- app/...``.
+    """
+    sites: list[str] = []
+    frame = sys._getframe(1)
+    while frame is not None and len(sites) < depth:
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_DIR) and filename != __file__:
+            relative = filename[len(APP_DIR) - len("app") :]
+            sites.append(f"{relative}:{frame.f_lineno} in {frame.f_code.co_name}")
+        frame = frame.f_back  # type: ignore[assignment]
+    return " <- ".join(sites) or "unknown"
+
+
+def before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+) -> None:
+    """Stamp the statement's start on its execution context."""
+    context._profile_start = time.perf_counter()
+
+
+def after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+) -> None:
+    """Add the statement to the current request's profile."""
+    # Timed on the context, so a statement that raises leaves no stale start
+    duration = time.perf_counter() - context._profile_start
+    if has_request_context() and "db_profile" in g:
+        g.db_profile.append(QueryRecord(statement, duration, call_site()))
+
+
+def profile_engine(engine: Engine) -> None:
+    """Attach the profiling listeners to an engine, once."""
+    if not event.contains(engine, "before_cursor_execute", before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+def init_profiling_middleware(app: Flask, settings: Settings) -> None:
+    """
+    Record every statement of a request and report on the request's queries.
+
+    Responses get ``X-DB-Queries`` (statement count) and ``X-DB-Time``
+    (total milliseconds). A request that runs more statements than
+    ``db_query_budget``, or repeats a statement (the N+1 pattern), is logged
+    as a warning listing each query with its duration and call site.
+    Walking the stack per statement is not free, so this is meant for
+    development and load tests rather than production.
+    """
+    budget = settings.db_query_budget
+
+    on_engine_created(profile_engine)
+
+    @app.before_request
+    def start_profile() -> None:
+        """Start collecting the request's statements."""
+        g.db_profile = []
+
+    @app.after_request
+    def report_profile(response: Response) -> Response:
+        """Attach the query summary and warn about query-heavy requests."""
+        queries: list[QueryRecord] | None = g.pop("db_profile", None)
+        if queries is None:
+            return response
+
+        total = sum(q.duration for q in queries)
+        response.headers["X-DB-Queries"] = str(len(queries))
+        response.headers["X-DB-Time"] = f"{total * 1000:.2f}"
+
+        repeated = {
+            statement: count
+            for statement, count in Counter(q.statement for q in queries).items()
+            if count > 1
+        }
+        if (budget > 0 and len(queries) > budget) or repeated:
+            lines = [
+                f"  {q.duration * 1000:7.2f} ms  {q.call_site}  "
+                f"{' '.join(q.statement.split())[:200]}"
+                for q in queries
+            ]
+            lines += [
+                f"  repeated {count}x: {' '.join(statement.split())[:200]}"
+                for statement, count in repeated.items()
+            ]
+            logger.warning(
+                "%s %s ran %d queries (budget %d) in %.2f ms\n%s",
+                request.method,
+                request.path,
+                len(queries),
+                budget,
+                total * 1000,
+                "\n".join(lines),
+            )
+        return response
@@ -1,27 +1,139 @@
 """Services middleware for dependency injection."""
 
+import atexit
+
 from flask import Flask, g
 from sqlmodel import Session
 
 from app.config import Settings
 from app.database import get_engine
-from app.services import Repository, WeatherService
+from app.models import Forecast, WeatherData
+from app.services import (
+    Codec,
+    ReferenceDataStore,
+    Repository,
+    TTLCache,
+    WeatherBroadcaster,
+    WeatherRefresher,
+    WeatherService,
+    create_cache_backend,
+    create_concurrency_limiter,
+    create_upstream_policy,
+)
 
 
 def init_services_middleware(app: Flask, settings: Settings) -> None:
-    """Initialize services middleware for dependency injection."""
-    engine = get_engine(settings)
+    """
+    Initialize services middleware for dependency injection.
+
+    Nothing here connects or starts threads: the database engine and the
+    HTTP client are created on first use, and the background refresher is
+    started by start_background_services in the process serving requests.
+    """
+
+    def session_factory() -> Session:
+        return Session(get_engine(settings))
+
+    reference_data = ReferenceDataStore(
+        session_factory, refresh_interval=settings.reference_data_refresh_interval
+    )
+    app.extensions["reference_data"] = reference_data
+
+    weather_cache: TTLCache[WeatherData] | None = None
+    if settings.weather_cache_ttl > 0:
+        weather_cache = TTLCache(
+            "weather",
+            ttl=settings.weather_cache_ttl,
+            max_size=settings.weather_cache_max_size,
+            max_stale=settings.weather_cache_max_stale,
+            backend=create_cache_backend(
+                settings, "weather", Codec(WeatherData.to_bytes, WeatherData.from_bytes)
+            ),
+            max_fallback_age=settings.weather_cache_max_fallback_age,
+        )
+    app.extensions["weather_cache"] = weather_cache
+
+    forecast_cache: TTLCache[Forecast] | None = None
+    if settings.weather_cache_ttl > 0:
+        # Forecasts are too large for mmap slots, so they are only shared via Redis
+        forecast_cache = TTLCache(
+            "forecast",
+            ttl=settings.weather_cache_ttl,
+            max_size=settings.weather_cache_max_size,
+            backend=create_cache_backend(
+                settings,
+                "forecast",
+                Codec(Forecast.to_bytes, Forecast.from_bytes),
+                allow_mmap=False,
+            ),
+            max_fallback_age=settings.weather_cache_max_fallback_age,
+        )
+    app.extensions["forecast_cache"] = forecast_cache
+
+    # Shared by all requests so the circuit sees every upstream failure
+    upstream = create_upstream_policy(settings)
+    atexit.register(upstream.shutdown)
+    app.extensions["weather_upstream"] = upstream
+
+    # Caps request threads waiting on Open-Meteo; the refresher is not capped
+    limiter = create_concurrency_limiter(settings)
+
+    # Keep the cache warm in the background when caching is enabled, and
+    # push each refresh to live stream clients
+    refresher: WeatherRefresher | None = None
+    broadcaster: WeatherBroadcaster | None = None
+    if weather_cache is not None and settings.weather_refresh_interval > 0:
+        broadcaster = WeatherBroadcaster(
+            max_subscribers=settings.weather_stream_max_clients,
+            heartbeat=settings.weather_stream_heartbeat,
+        )
+        refresher = WeatherRefresher(
+            settings,
+            session_factory,
+            reference_data,
+            weather_cache,
+            upstream=upstream,
+            broadcaster=broadcaster,
+        )
+        atexit.register(refresher.stop)
+        atexit.register(broadcaster.close)
+    app.extensions["weather_refresher"] = refresher
+    app.extensions["weather_broadcaster"] = broadcaster
 
     @app.before_request
     def inject_services() -> None:
         """Inject services into Flask's g object."""
-        g.db_session = Session(engine)
-        g.repository = Repository(g.db_session)
-        g.weather_service = WeatherService(settings, g.repository)
+        if refresher is not None:
+            refresher.start()
+        g.repository = Repository(
+            reference=reference_data, session_factory=session_factory
+        )
+        g.weather_service = WeatherService(
+            settings,
+            g.repository,
+            cache=weather_cache,
+            forecast_cache=forecast_cache,
+            upstream=upstream,
+            limiter=limiter,
+        )
 
     @app.teardown_request
     def cleanup_session(exception: BaseException | None = None) -> None:
-        """Close database session after request."""
-        session: Session | None = g.pop("db_session", None)
-        if session is not None:
-            session.close()
+        """Close database session after request, if one was opened."""
+        repository: Repository | None = g.pop("repository", None)
+        if repository is not None:
+            repository.close()
+
+
+def start_background_services(app: Flask) -> None:
+    """
+    Start the app's background threads in the current process.
+
+    Threads do not survive a fork, so with ``gunicorn --preload`` they must
+    be started in each worker rather than in the master that built the app.
+    The gunicorn ``post_worker_init`` hook calls this; otherwise the first
+    request does. Calling it again is a no-op.
+    """
+    refresher: WeatherRefresher | None = app.extensions.get("weather_refresher")
+    if refresher is not None:
+        refresher.start()
@@ -1,7 +1,16 @@
 """Database models for the weather application."""
 
 from app.models.city import City
+from app.models.forecast import Forecast, ForecastSeries
 from app.models.weather_code import WeatherCode
 from app.models.weather_data import WeatherData
+from app.models.weather_observation import WeatherObservation
 
-__all__ = ["City", "WeatherCode", "WeatherData"]
+__all__ = [
+    "City",
+    "Forecast",
+    "ForecastSeries",
+    "WeatherCode",
+    "WeatherData",
+    "WeatherObservation",
+]
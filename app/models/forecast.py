@@ -0,0 +1,112 @@
+"""Forecast model with columnar (array-backed) storage."""
+
+from __future__ import annotations
+
+import json
+import math
+from array import array
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+
+
+def _to_array(values: Sequence[float | None]) -> array[float]:
+    """Convert an API value list to a float array, mapping nulls to NaN."""
+    try:
+        return array("d", values)  # type: ignore[arg-type]
+    except TypeError:
+        return array("d", (math.nan if v is None else v for v in values))
+
+
+@dataclass(frozen=True, slots=True)
+class ForecastSeries:
+    """Forecast variables sharing one time axis, stored as parallel arrays."""
+
+    time: tuple[str, ...]
+    values: Mapping[str, array[float]]
+
+    @classmethod
+    def from_api(
+        cls, data: Mapping[str, Any], variables: Sequence[str]
+    ) -> ForecastSeries:
+        """
+        Build a series from an Open-Meteo ``hourly`` or ``daily`` block.
+
+        Raises:
+            KeyError: If a requested variable is missing
+            ValueError: If a variable does not match the time axis length
+        """
+        time = tuple(data["time"])
+        values = {name: _to_array(data[name]) for name in variables}
+        for name, column in values.items():
+            if len(column) != len(time):
+                raise ValueError(
+                    f"{name} has {len(column)} values, expected {len(time)}"
+                )
+        return cls(time=time, values=MappingProxyType(values))
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def summary(self) -> dict[str, dict[str, float | None]]:
+        """Min, max and mean per variable, ignoring missing values."""
+        result: dict[str, dict[str, float | None]] = {}
+        for name, column in self.values.items():
+            total = math.fsum(column)
+            if math.isnan(total):
+                column = array("d", (v for v in column if not math.isnan(v)))
+                total = math.fsum(column)
+            if not column:
+                result[name] = {"min": None, "max": None, "mean": None}
+                continue
+            result[name] = {
+                "min": min(column),
+                "max": max(column),
+                "mean": round(total / len(column), 2),
+            }
+        return result
+
+    def to_dict(self) -> dict[str, list[Any]]:
+        """Serialize to JSON-compatible columns (NaN becomes null)."""
+        columns: dict[str, list[Any]] = {"time": list(self.time)}
+        for name, column in self.values.items():
+            values: list[Any] = column.tolist()
+            if math.isnan(math.fsum(column)):
+                values = [None if math.isnan(v) else v for v in values]
+            columns[name] = values
+        return columns
+
+
+@dataclass(frozen=True, slots=True)
+class Forecast:
+    """Hourly and daily forecast for one location."""
+
+    hourly: ForecastSeries
+    daily: ForecastSeries
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize columns and aggregates for JSON responses."""
+        return {
+            "hourly": self.hourly.to_dict(),
+            "daily": self.daily.to_dict(),
+            "summary": {
+                "hourly": self.hourly.summary(),
+                "daily": self.daily.summary(),
+            },
+        }
+
+    def to_bytes(self) -> bytes:
+        """Serialize columns to compact JSON for shared caches."""
+        columns = {"hourly": self.hourly.to_dict(), "daily": self.daily.to_dict()}
+        return json.dumps(columns, separators=(",", ":")).encode()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Forecast:
+        """Rebuild a forecast from ``to_bytes`` output."""
+        columns = json.loads(data)
+        hourly, daily = columns["hourly"], columns["daily"]
+        return cls(
+            hourly=ForecastSeries.from_api(hourly, [k for k in hourly if k != "time"]),
+            daily=ForecastSeries.from_api(daily, [k for k in daily if k != "time"]),
+        )
@@ -1,7 +1,12 @@
 """Weather data model for API responses."""
 
+import struct
+
 from pydantic import BaseModel
 
+# temperature, windspeed, winddirection, weathercode, len(time), len(description)
+_PACKED_HEADER = struct.Struct("<ddhhHH")
+
 
 class WeatherData(BaseModel):
     """Weather data from Open-Meteo API."""
@@ -19,3 +24,33 @@ class WeatherData(BaseModel):
         directions = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
         index = round(self.winddirection / 45) % 8
         return directions[index]
+
+    def to_bytes(self) -> bytes:
+        """Pack into a compact binary form for shared caches."""
+        time = self.time.encode()
+        description = self.description.encode()
+        header = _PACKED_HEADER.pack(
+            self.temperature,
+            self.windspeed,
+            self.winddirection,
+            self.weathercode,
+            len(time),
+            len(description),
+        )
+        return header + time + description
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "WeatherData":
+        """Unpack a value produced by ``to_bytes``."""
+        temperature, windspeed, winddirection, weathercode, time_len, desc_len = (
+            _PACKED_HEADER.unpack_from(data)
+        )
+        offset = _PACKED_HEADER.size
+        return cls(
+            temperature=temperature,
+            windspeed=windspeed,
+            winddirection=winddirection,
+            weathercode=weathercode,
+            time=data[offset : offset + time_len].decode(),
+            description=data[offset + time_len : offset + time_len + desc_len].decode(),
+        )
@@ -0,0 +1,41 @@
+"""Weather observation model for stored weather readings."""
+
+from datetime import UTC, datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer
+from sqlmodel import Field, SQLModel
+
+from app.models.weather_data import WeatherData
+
+
+class WeatherObservation(SQLModel, table=True):
+    """Weather reading for a city at a point in time."""
+
+    __tablename__ = "weather_observations"
+
+    city_id: int = Field(
+        sa_column=Column(
+            Integer,
+            ForeignKey("cities.id", ondelete="CASCADE"),
+            primary_key=True,
+        )
+    )
+    observed_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), primary_key=True)
+    )
+    temperature: float
+    windspeed: float
+    winddirection: int
+    weathercode: int
+
+    @classmethod
+    def from_weather(cls, city_id: int, weather: WeatherData) -> "WeatherObservation":
+        """Build an observation from API weather data (times are in UTC)."""
+        return cls(
+            city_id=city_id,
+            observed_at=datetime.fromisoformat(weather.time).replace(tzinfo=UTC),
+            temperature=weather.temperature,
+            windspeed=weather.windspeed,
+            winddirection=weather.winddirection,
+            weathercode=weather.weathercode,
+        )
@@ -1,7 +1,9 @@
 """Health check endpoints for Kubernetes probes."""
 
 from flask import Blueprint, Response, g
-from sqlmodel import Session, text
+from sqlmodel import text
+
+from app.services import Repository
 
 bp = Blueprint("health", __name__)
 
@@ -16,8 +18,8 @@ def health() -> Response:
 def ready() -> Response:
     """Readiness probe endpoint."""
     try:
-        session: Session = g.db_session
-        session.exec(text("SELECT 1"))  # type: ignore[call-overload]
+        repository: Repository = g.repository
+        repository.session.exec(text("SELECT 1"))  # type: ignore[call-overload]
         return Response("ok", status=200, mimetype="text/plain")
     except Exception:
         return Response("database unavailable", status=503, mimetype="text/plain")
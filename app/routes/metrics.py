@@ -0,0 +1,14 @@
+"""Prometheus metrics endpoint."""
+
+from flask import Blueprint, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from app.metrics import get_registry
+
+bp = Blueprint("metrics", __name__)
+
+
+@bp.route("/metrics")
+def metrics() -> Response:
+    """Expose metrics in Prometheus text format."""
+    return Response(generate_latest(get_registry()), mimetype=CONTENT_TYPE_LATEST)
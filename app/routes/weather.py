@@ -1,13 +1,72 @@
 """Weather route handlers."""
 
-from flask import Blueprint, Response, flash, g, jsonify, render_template
+import hashlib
+import json
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    flash,
+    g,
+    jsonify,
+    render_template,
+    request,
+)
 
 from app.forms import CityForm
-from app.middleware import validate_form
-from app.services import Repository, WeatherAPIError, WeatherService
+from app.middleware import (
+    admission_controlled,
+    http_cache,
+    limit_max_age,
+    validate_form,
+)
+from app.models import WeatherData
+from app.services import (
+    ReferenceDataStore,
+    Repository,
+    SubscriberLimitError,
+    TTLCache,
+    UpstreamBusyError,
+    WeatherAPIError,
+    WeatherBroadcaster,
+    WeatherService,
+)
+from app.services.weather import FORECAST_MAX_DAYS
 
 bp = Blueprint("weather", __name__)
 
+SEARCH_MAX_LIMIT = 50
+WEATHER_BATCH_MAX_CITIES = 100
+
+
+def reference_version() -> str:
+    """Current reference data version, used as ETag for city listings."""
+    reference_data: ReferenceDataStore = current_app.extensions["reference_data"]
+    return reference_data.snapshot.version
+
+
+def weather_etag(readings: Mapping[str, WeatherData]) -> str:
+    """
+    ETag from the reference data version and each city's observation time.
+
+    A reading only changes when Open-Meteo publishes a new observation, so
+    this identifies the response without hashing its body.
+    """
+    digest = hashlib.blake2b(reference_version().encode(), digest_size=12)
+    for city, weather in readings.items():
+        digest.update(f"\0{city}\0{weather.time}".encode())
+    return digest.hexdigest()
+
+
+# max-age is lowered per response to what is left of the cached data's TTL
+weather_http_cache = http_cache(
+    max_age=lambda s: s.weather_cache_ttl,
+    stale_while_revalidate=lambda s: s.weather_cache_max_stale,
+)
+
 
 @bp.route("/")
 def index() -> str:
@@ -17,6 +76,11 @@ def index() -> str:
 
 
 @bp.route("/api/cities")
+@http_cache(
+    max_age=lambda s: s.reference_data_refresh_interval,
+    stale_while_revalidate=lambda s: s.reference_data_refresh_interval,
+    etag=reference_version,
+)
 def api_cities() -> Response:
     """Return JSON list of available Czech cities."""
     repository: Repository = g.repository
@@ -31,7 +95,244 @@ def api_cities() -> Response:
     )
 
 
+@bp.route("/api/cities/search")
+@http_cache(
+    max_age=lambda s: s.reference_data_refresh_interval,
+    stale_while_revalidate=lambda s: s.reference_data_refresh_interval,
+    etag=reference_version,
+)
+def api_cities_search() -> tuple[Response, int] | Response:
+    """
+    Return cities matching a name prefix, ignoring case and diacritics.
+
+    Query parameters: ``q`` (e.g. ``ceske bud``) and ``limit`` (1 to 50,
+    default 10). Falls back to similar names when nothing starts with ``q``.
+    """
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "Parameter 'q' is required."}), 400
+    limit = request.args.get("limit", 10, type=int)
+    if not 1 <= limit <= SEARCH_MAX_LIMIT:
+        msg = f"Parameter 'limit' must be between 1 and {SEARCH_MAX_LIMIT}."
+        return jsonify({"error": msg}), 400
+
+    repository: Repository = g.repository
+    cities = repository.search_cities(query, limit)
+    return jsonify(
+        {
+            "query": query,
+            "cities": [
+                {"name": c.name, "latitude": c.latitude, "longitude": c.longitude}
+                for c in cities
+            ],
+        }
+    )
+
+
+@bp.route("/api/weather")
+@admission_controlled
+@weather_http_cache
+def api_weather() -> tuple[Response, int] | Response:
+    """
+    Return current weather for many cities in one response.
+
+    Query parameter ``cities`` takes up to 100 comma-separated city names,
+    or ``all``.
+    Failures are reported per city and do not fail the whole batch, unless
+    every city failed and the upstream call was shed (503).
+    """
+    requested = request.args.get("cities", "").strip()
+    if not requested:
+        return jsonify({"error": "Parameter 'cities' is required."}), 400
+
+    repository: Repository = g.repository
+    if requested == "all":
+        cities = repository.get_all_cities()
+        names = [c.name for c in cities]
+        found = {c.name: c for c in cities}
+    else:
+        names = list(dict.fromkeys(n.strip() for n in requested.split(",")))
+        names = [n for n in names if n]
+        if len(names) > WEATHER_BATCH_MAX_CITIES:
+            msg = f"Parameter 'cities' takes at most {WEATHER_BATCH_MAX_CITIES} names."
+            return jsonify({"error": msg}), 400
+        found = repository.get_cities_by_names(names)
+
+    weather_service: WeatherService = g.weather_service
+    known = [found[n] for n in names if n in found]
+    weather = weather_service.get_current_weather_batch(
+        [(c.latitude, c.longitude) for c in known]
+    )
+    by_name = dict(zip((c.name for c in known), weather, strict=True))
+    # Shed with nothing to show: answer 503 rather than a page of errors
+    busy = [r for r in weather if isinstance(r, UpstreamBusyError)]
+    if busy and all(isinstance(r, WeatherAPIError) for r in weather):
+        raise busy[0]
+    if any(isinstance(r, WeatherAPIError) for r in weather):
+        limit_max_age(0)
+    else:
+        limit_max_age(
+            weather_service.current_weather_expires_in(
+                [(c.latitude, c.longitude) for c in known]
+            )
+        )
+
+    results: list[dict[str, Any]] = []
+    for name in names:
+        result = by_name.get(name)
+        if result is None:
+            results.append({"city": name, "error": "Unknown city."})
+        elif isinstance(result, WeatherAPIError):
+            results.append({"city": name, "error": str(result)})
+        else:
+            results.append({"city": name, "weather": result.model_dump()})
+
+    response = jsonify({"results": results})
+    response.set_etag(
+        weather_etag({n: r for n, r in by_name.items() if isinstance(r, WeatherData)})
+    )
+    return response
+
+
+@bp.route("/api/weather/nearest")
+@admission_controlled
+@weather_http_cache
+def api_weather_nearest() -> tuple[Response, int] | Response:
+    """
+    Return current weather for the city nearest to the given coordinates.
+
+    Query parameters: ``lat`` (-90 to 90) and ``lon`` (-180 to 180).
+    """
+    latitude = request.args.get("lat", type=float)
+    longitude = request.args.get("lon", type=float)
+    if latitude is None or not -90 <= latitude <= 90:
+        return jsonify({"error": "Parameter 'lat' must be between -90 and 90."}), 400
+    if longitude is None or not -180 <= longitude <= 180:
+        msg = "Parameter 'lon' must be between -180 and 180."
+        return jsonify({"error": msg}), 400
+
+    repository: Repository = g.repository
+    nearest = repository.get_nearest_city(latitude, longitude)
+    if nearest is None:
+        return jsonify({"error": "No cities available."}), 404
+    city, distance = nearest
+
+    weather_service: WeatherService = g.weather_service
+    try:
+        weather = weather_service.get_current_weather(city.latitude, city.longitude)
+    except UpstreamBusyError:
+        raise
+    except WeatherAPIError as e:
+        return jsonify({"error": f"Could not fetch weather data: {e}"}), 502
+    limit_max_age(
+        weather_service.current_weather_expires_in([(city.latitude, city.longitude)])
+    )
+
+    response = jsonify(
+        {
+            "city": city.name,
+            "latitude": city.latitude,
+            "longitude": city.longitude,
+            "distance_km": round(distance, 2),
+            "weather": weather.model_dump(),
+        }
+    )
+    response.set_etag(weather_etag({city.name: weather}))
+    return response
+
+
+@bp.route("/api/weather/stream")
+def api_weather_stream() -> tuple[Response, int] | Response:
+    """
+    Stream current weather changes as server-sent events.
+
+    Each ``weather`` event carries one city's reading; the latest reading of
+    every city is sent on connect. Optional query parameter ``cities`` takes
+    comma-separated city names. Comment lines are sent as keep-alives.
+    """
+    broadcaster: WeatherBroadcaster | None = current_app.extensions[
+        "weather_broadcaster"
+    ]
+    if broadcaster is None:
+        return jsonify({"error": "Live updates are disabled."}), 503
+
+    requested = request.args.get("cities", "").strip()
+    cities = {n.strip() for n in requested.split(",") if n.strip()} or None
+
+    try:
+        subscription = broadcaster.subscribe(cities)
+    except SubscriberLimitError as e:
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = str(broadcaster.heartbeat)
+        return response, 503
+
+    def events() -> Iterator[str]:
+        try:
+            yield f"retry: {broadcaster.heartbeat * 1000}\n\n"
+            while not subscription.closed:
+                updates = subscription.wait(broadcaster.heartbeat)
+                if not updates:
+                    yield ": keep-alive\n\n"
+                for city, weather in updates.items():
+                    data = json.dumps({"city": city, "weather": weather.model_dump()})
+                    yield f"event: weather\ndata: {data}\n\n"
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@bp.route("/api/forecast")
+@admission_controlled
+@weather_http_cache
+def api_forecast() -> tuple[Response, int] | Response:
+    """
+    Return hourly and daily forecast for a city.
+
+    Query parameters: ``city`` (required) and ``days`` (1-16, default 7).
+    """
+    name = request.args.get("city", "").strip()
+    days = request.args.get("days", 7, type=int)
+    if not name:
+        return jsonify({"error": "Parameter 'city' is required."}), 400
+    if days is None or not 1 <= days <= FORECAST_MAX_DAYS:
+        msg = f"Parameter 'days' must be between 1 and {FORECAST_MAX_DAYS}."
+        return jsonify({"error": msg}), 400
+
+    repository: Repository = g.repository
+    city = repository.get_city_by_name(name)
+    if city is None:
+        return jsonify({"error": "Unknown city."}), 404
+
+    weather_service: WeatherService = g.weather_service
+    try:
+        forecast = weather_service.get_forecast(city.latitude, city.longitude, days)
+    except UpstreamBusyError:
+        raise
+    except WeatherAPIError as e:
+        return jsonify({"error": f"Could not fetch forecast: {e}"}), 502
+    limit_max_age(
+        weather_service.forecast_expires_in(city.latitude, city.longitude, days)
+    )
+
+    return jsonify({"city": city.name, **forecast.to_dict()})
+
+
+@bp.route("/api/cache/stats")
+def api_cache_stats() -> Response:
+    """Return weather cache hit/miss/coalesce counters."""
+    cache: TTLCache[WeatherData] | None = current_app.extensions["weather_cache"]
+    if cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **cache.stats().to_dict()})
+
+
 @bp.route("/weather", methods=["POST"])
+@admission_controlled
 @validate_form(CityForm, on_error="weather.index")
 def weather(form: CityForm) -> str:
     """Fetch and display weather for selected city."""
@@ -49,6 +350,8 @@ def weather(form: CityForm) -> str:
                 latitude=city.latitude,
                 longitude=city.longitude,
             )
+        except UpstreamBusyError:
+            raise
         except WeatherAPIError as e:
             flash(f"Could not fetch weather data: {e}", "error")
     else:
@@ -1,6 +1,70 @@
 """Services package for external API integrations."""
 
-from app.services.repository import Repository
-from app.services.weather import WeatherAPIError, WeatherService
+from app.services.admission import (
+    ConcurrencyLimiter,
+    MemoryRateLimiter,
+    RateLimiter,
+    RedisRateLimiter,
+    create_concurrency_limiter,
+    create_rate_limiter,
+)
+from app.services.broadcast import (
+    SubscriberLimitError,
+    Subscription,
+    WeatherBroadcaster,
+)
+from app.services.cache import CacheStats, TTLCache
+from app.services.cache_backends import (
+    CacheBackend,
+    Codec,
+    MemoryBackend,
+    MmapBackend,
+    RedisBackend,
+    create_cache_backend,
+)
+from app.services.geo import CityIndex
+from app.services.reference import ReferenceData, ReferenceDataStore
+from app.services.refresher import WeatherRefresher
+from app.services.repository import Repository, SyncResult
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    UpstreamPolicy,
+    create_upstream_policy,
+)
+from app.services.search import CitySearchIndex
+from app.services.weather import UpstreamBusyError, WeatherAPIError, WeatherService
 
-__all__ = ["Repository", "WeatherService", "WeatherAPIError"]
+__all__ = [
+    "Repository",
+    "SyncResult",
+    "WeatherService",
+    "WeatherAPIError",
+    "UpstreamBusyError",
+    "TTLCache",
+    "CacheStats",
+    "ReferenceData",
+    "ReferenceDataStore",
+    "WeatherRefresher",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "UpstreamPolicy",
+    "create_upstream_policy",
+    "CityIndex",
+    "CitySearchIndex",
+    "CacheBackend",
+    "Codec",
+    "MemoryBackend",
+    "MmapBackend",
+    "RedisBackend",
+    "create_cache_backend",
+    "SubscriberLimitError",
+    "Subscription",
+    "WeatherBroadcaster",
+    "RateLimiter",
+    "MemoryRateLimiter",
+    "RedisRateLimiter",
+    "ConcurrencyLimiter",
+    "create_concurrency_limiter",
+    "create_rate_limiter",
+]
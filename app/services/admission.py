@@ -0,0 +1,210 @@
+"""Per-client rate limiting and a cap on concurrent upstream calls."""
+
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from app.config import Settings
+from app.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_WAIT, ADMISSION_QUEUED
+
+if TYPE_CHECKING:
+    from redis import Redis
+
+logger = logging.getLogger(__name__)
+
+# Refills the bucket for the time since the last request, then takes a token.
+# Uses the Redis clock so every worker and host sees the same time.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RateLimiter(ABC):
+    """
+    Token bucket per client: ``burst`` requests at once, refilled at ``rate``
+    tokens per second.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+
+    @abstractmethod
+    def take(self, key: str) -> float:
+        """Take a token for key; return 0 if admitted, else seconds to wait."""
+
+
+class MemoryRateLimiter(RateLimiter):
+    """
+    Buckets kept in this process, so each worker limits on its own.
+
+    Only the ``max_clients`` most recently seen clients are tracked; a
+    client evicted for being idle would have had a full bucket anyway.
+    """
+
+    def __init__(self, rate: float, burst: int, max_clients: int = 10000) -> None:
+        super().__init__(rate, burst)
+        self.max_clients = max_clients
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Buckets in Redis, shared by all workers and hosts.
+
+    Each check is one atomic script call. Redis errors are logged and the
+    request is admitted, so an unavailable Redis disables rate limiting
+    rather than the site. Requires the ``redis`` extra.
+    """
+
+    def __init__(self, client: "Redis", rate: float, burst: int) -> None:
+        super().__init__(rate, burst)
+        self.prefix = "czech-weather:ratelimit:"
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def take(self, key: str) -> float:
+        try:
+            wait = self._script(keys=[self.prefix + key], args=[self.rate, self.burst])
+        except Exception:
+            logger.warning("Redis rate limit check failed", exc_info=True)
+            return 0.0
+        return float(wait)
+
+
+class ConcurrencyLimiter:
+    """
+    Bounded number of upstream calls in flight, with a short bounded queue.
+
+    A call beyond ``max_in_flight`` waits up to ``queue_timeout`` seconds
+    for a slot, unless ``max_queue`` calls are already waiting; either way
+    ``acquire`` returns False and the call should be shed. Only calls that
+    go upstream take a slot, so cache hits are never queued. The limit is
+    per process: each worker's threads are what a slow upstream ties up.
+    """
+
+    def __init__(
+        self, max_in_flight: int, max_queue: int, queue_timeout: float
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._in_flight = 0
+        self._waiting = 0
+        self._condition = threading.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        """Calls currently holding a slot."""
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        """Calls currently queued for a slot."""
+        return self._waiting
+
+    def acquire(self) -> bool:
+        """Take a slot, waiting briefly if needed; False if the call is shed."""
+        with self._condition:
+            if self._in_flight < self.max_in_flight:
+                self._take_slot()
+                return True
+            if self._waiting >= self.max_queue:
+                return False
+
+            self._waiting += 1
+            ADMISSION_QUEUED.inc()
+            started = time.perf_counter()
+            try:
+                admitted = self._condition.wait_for(
+                    lambda: self._in_flight < self.max_in_flight, self.queue_timeout
+                )
+            finally:
+                self._waiting -= 1
+                ADMISSION_QUEUED.dec()
+                ADMISSION_QUEUE_WAIT.observe(time.perf_counter() - started)
+            if admitted:
+                self._take_slot()
+            return admitted
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free right now, without queueing."""
+        with self._condition:
+            if self._in_flight >= self.max_in_flight:
+                return False
+            self._take_slot()
+            return True
+
+    def release(self) -> None:
+        """Give back a slot taken by acquire or try_acquire."""
+        with self._condition:
+            self._in_flight -= 1
+            ADMISSION_IN_FLIGHT.dec()
+            self._condition.notify()
+
+    def _take_slot(self) -> None:
+        self._in_flight += 1
+        ADMISSION_IN_FLIGHT.inc()
+
+
+def create_rate_limiter(settings: Settings) -> RateLimiter | None:
+    """Build the rate limiter selected by settings; None when disabled."""
+    if settings.rate_limit_per_minute <= 0:
+        return None
+    rate = settings.rate_limit_per_minute / 60
+    burst = max(settings.rate_limit_burst, 1)
+    if settings.rate_limit_backend == "redis":
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "RATE_LIMIT_BACKEND=redis requires the 'redis' extra"
+            ) from e
+        client = redis.Redis.from_url(settings.rate_limit_redis_url)
+        return RedisRateLimiter(client, rate, burst)
+    return MemoryRateLimiter(rate, burst)
+
+
+def create_concurrency_limiter(settings: Settings) -> ConcurrencyLimiter | None:
+    """Build the cap on concurrent upstream calls; None when disabled."""
+    if settings.admission_max_in_flight <= 0:
+        return None
+    return ConcurrencyLimiter(
+        settings.admission_max_in_flight,
+        settings.admission_max_queue,
+        settings.admission_queue_timeout,
+    )
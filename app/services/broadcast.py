@@ -0,0 +1,134 @@
+"""Fan-out of live weather updates to streaming clients."""
+
+import threading
+from collections.abc import Collection, Mapping
+
+from app.metrics import STREAM_CLIENTS
+from app.models import WeatherData
+
+
+class SubscriberLimitError(Exception):
+    """Raised when the broadcaster already serves its maximum of clients."""
+
+    pass
+
+
+class Subscription:
+    """
+    One client's view of the update stream.
+
+    Pending updates are kept as the latest reading per city, so a client that
+    reads slower than updates arrive skips intermediate readings instead of
+    queueing them: memory per client is bounded by the number of cities and
+    a slow client never delays the publisher or other clients.
+    """
+
+    def __init__(self, cities: Collection[str] | None) -> None:
+        self.cities = frozenset(cities) if cities is not None else None
+        self.closed = False
+        self._pending: dict[str, WeatherData] = {}
+        self._condition = threading.Condition()
+
+    def wants(self, city: str) -> bool:
+        """Whether this client subscribed to the given city."""
+        return self.cities is None or city in self.cities
+
+    def push(self, updates: Mapping[str, WeatherData]) -> None:
+        """Merge updates into the pending set, replacing older readings."""
+        with self._condition:
+            for city, weather in updates.items():
+                if self.wants(city):
+                    self._pending[city] = weather
+            if self._pending:
+                self._condition.notify()
+
+    def wait(self, timeout: float) -> dict[str, WeatherData]:
+        """Return pending updates, waiting up to timeout for some to arrive."""
+        with self._condition:
+            if not self._pending and not self.closed:
+                self._condition.wait(timeout)
+            updates, self._pending = self._pending, {}
+            return updates
+
+    def close(self) -> None:
+        """End the subscription and wake up a waiting reader."""
+        with self._condition:
+            self.closed = True
+            self._condition.notify()
+
+
+class WeatherBroadcaster:
+    """
+    Publishes weather changes from the background refresher to all clients.
+
+    The refresher polls Open-Meteo once per city for the whole process, so
+    the upstream cost does not grow with the number of connected viewers.
+    New subscribers immediately receive the latest known reading per city.
+    """
+
+    def __init__(self, max_subscribers: int, heartbeat: float) -> None:
+        self.max_subscribers = max_subscribers
+        self.heartbeat = heartbeat
+        self._latest: dict[str, WeatherData] = {}
+        self._subscribers: set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of connected clients."""
+        return len(self._subscribers)
+
+    def subscribe(self, cities: Collection[str] | None = None) -> Subscription:
+        """
+        Register a client, optionally limited to some cities.
+
+        Raises:
+            SubscriberLimitError: If ``max_subscribers`` clients are connected
+        """
+        subscription = Subscription(cities)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise SubscriberLimitError(
+                    f"Too many stream clients ({self.max_subscribers})"
+                )
+            self._subscribers.add(subscription)
+            latest = dict(self._latest)
+        STREAM_CLIENTS.inc()
+        subscription.push(latest)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a client; safe to call more than once."""
+        with self._lock:
+            if subscription not in self._subscribers:
+                return
+            self._subscribers.discard(subscription)
+        STREAM_CLIENTS.dec()
+        subscription.close()
+
+    def publish(self, readings: Mapping[str, WeatherData]) -> int:
+        """
+        Send readings that differ from the last published ones.
+
+        Returns:
+            Number of cities whose reading changed
+        """
+        with self._lock:
+            changed = {
+                city: weather
+                for city, weather in readings.items()
+                if self._latest.get(city) != weather
+            }
+            self._latest.update(changed)
+            subscribers = list(self._subscribers)
+        if changed:
+            for subscription in subscribers:
+                subscription.push(changed)
+        return len(changed)
+
+    def close(self) -> None:
+        """Disconnect all clients."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            self.unsubscribe(subscription)
@@ -0,0 +1,384 @@
+"""TTL cache with pluggable storage and request coalescing."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Hashable, Iterable, Mapping
+from contextlib import AbstractContextManager
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+from app.metrics import CACHE_REQUESTS
+from app.services.cache_backends import CacheBackend, MemoryBackend
+
+T = TypeVar("T")
+K = TypeVar("K", bound=Hashable)
+E = TypeVar("E", bound=Exception)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Snapshot of cache counters."""
+
+    hits: int
+    misses: int
+    coalesced: int
+    stale: int
+    fallback: int
+    size: int
+
+    @property
+    def hit_ratio(self) -> float:
+        """Share of lookups answered without waiting for an upstream call."""
+        served = self.hits + self.coalesced + self.stale
+        total = served + self.misses
+        return served / total if total else 0.0
+
+    def to_dict(self) -> dict[str, int | float]:
+        """Serialize stats for JSON responses."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "stale": self.stale,
+            "fallback": self.fallback,
+            "size": self.size,
+            "hit_ratio": round(self.hit_ratio, 4),
+        }
+
+
+@dataclass
+class _Flight(Generic[T]):
+    """In-flight load shared by all callers waiting on the same key."""
+
+    done: threading.Event = field(default_factory=threading.Event)
+    value: T | None = None
+    # Raised by the loader, or reported for this key by a batch loader
+    error: BaseException | None = None
+    failure: Exception | None = None
+
+
+class TTLCache(Generic[T]):
+    """
+    Thread-safe TTL cache with single-flight loading.
+
+    Entries live in a backend: an in-process LRU by default, or storage
+    shared between workers (see ``app.services.cache_backends``). Freshness
+    checks, coalescing and counters are per process.
+
+    Concurrent misses for the same key are coalesced: the first caller runs
+    the loader while the others wait for its result, so a burst of identical
+    requests produces exactly one load. Failed loads are not cached.
+
+    With ``max_stale`` set, entries older than the TTL are still served for
+    up to ``max_stale`` more seconds while a background thread reloads them
+    (stale-while-revalidate); only older entries block on a live load.
+    Expired entries stay in the cache until evicted so callers can fall back
+    to them with ``last_known_good`` when a load fails, as long as they are
+    at most ``max_fallback_age`` seconds old.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        max_size: int,
+        max_stale: float = 0.0,
+        backend: CacheBackend[T] | None = None,
+        max_fallback_age: float = 0.0,
+    ) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.max_size = max_size
+        self.max_stale = max_stale
+        self.max_fallback_age = max_fallback_age
+        self.backend = backend if backend is not None else MemoryBackend(max_size)
+        self._flights: dict[Hashable, _Flight[T]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._stale = 0
+        self._fallback = 0
+        self._hit_counter = CACHE_REQUESTS.labels(name, "hit")
+        self._miss_counter = CACHE_REQUESTS.labels(name, "miss")
+        self._coalesced_counter = CACHE_REQUESTS.labels(name, "coalesced")
+        self._stale_counter = CACHE_REQUESTS.labels(name, "stale")
+        self._fallback_counter = CACHE_REQUESTS.labels(name, "fallback")
+
+    def get(self, key: Hashable) -> T | None:
+        """Return a fresh cached value or None, counting a hit or miss."""
+        value, fresh = self._lookup(key)
+        with self._lock:
+            if value is None or not fresh:
+                self._count_miss()
+                return None
+            self._count_hit()
+            return value
+
+    def set(self, key: Hashable, value: T) -> None:
+        """Store a value, evicting older entries if the backend is full."""
+        self.backend.set(key, value, time.time())
+
+    def set_many(self, items: Mapping[Hashable, T]) -> None:
+        """Store several values at once."""
+        self.backend.set_many(items, time.time())
+
+    def get_recent(self, keys: Iterable[K], max_age: float) -> dict[K, T]:
+        """
+        Return values stored less than ``max_age`` seconds ago.
+
+        This does not count hits or misses: it is for writers deciding
+        what still needs loading, not for readers.
+        """
+        now = time.time()
+        return {
+            key: value
+            for key, (stored_at, value) in self.backend.get_many(keys).items()
+            if now - stored_at < max_age
+        }
+
+    def lock(self, name: str, timeout: float) -> AbstractContextManager[None]:
+        """Exclusive lock across the processes sharing the backend."""
+        return self.backend.lock(name, timeout)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], T]) -> T:
+        """
+        Return the cached value for key, loading it once on a miss.
+
+        Args:
+            key: Cache key
+            loader: Callable producing the value; exceptions propagate to
+                every caller waiting on the same key
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        value, fresh = self._lookup(key)
+        with self._lock:
+            if value is not None and fresh:
+                self._count_hit()
+                return value
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = _Flight()
+                self._flights[key] = flight
+
+            if value is not None:
+                self._count_stale()
+            elif leader:
+                self._count_miss()
+            else:
+                self._count_coalesced()
+
+        if value is not None:
+            if leader:
+                threading.Thread(
+                    target=self._revalidate,
+                    args=(key, flight, loader),
+                    daemon=True,
+                ).start()
+            return value
+
+        if not leader:
+            flight.done.wait()
+            # A batch load reports a failed key instead of raising
+            error = flight.error or flight.failure
+            if error is not None:
+                raise error
+            return flight.value  # type: ignore[return-value]
+
+        # Another thread may have stored the value since the lookup above
+        value, fresh = self._lookup(key)
+        if value is not None and fresh:
+            self._resolve(key, flight, value)
+            return value
+        return self._load(key, flight, loader)
+
+    def get_or_load_many(
+        self,
+        keys: Iterable[K],
+        loader: Callable[[list[K]], Mapping[K, T | E]],
+    ) -> dict[K, T | E]:
+        """
+        Return values for many keys, loading all missing ones with one call.
+
+        Each key is treated as in get_or_load without stale serving: fresh
+        entries are hits, keys another thread is already loading are waited
+        for, and the rest are loaded together and stored.
+
+        Args:
+            keys: Cache keys
+            loader: Callable taking the keys to load and returning a value or
+                the exception for each of them; per-key exceptions are
+                returned to every caller wanting that key and not cached.
+                An exception raised by this call's loader propagates.
+
+        Returns:
+            Value or exception for each key; a key whose load this call
+            waited on (another batch, or a get_or_load caller) and which
+            failed gets that load's exception
+        """
+        unique = list(dict.fromkeys(keys))
+        now = time.time()
+        entries = self.backend.get_many(unique)
+        results: dict[K, T | E] = {}
+        leading: dict[K, _Flight[T]] = {}
+        waiting: dict[K, _Flight[T]] = {}
+        with self._lock:
+            for key in unique:
+                entry = entries.get(key)
+                if entry is not None and now - entry[0] <= self.ttl:
+                    self._count_hit()
+                    results[key] = entry[1]
+                elif key in self._flights:
+                    self._count_coalesced()
+                    waiting[key] = self._flights[key]
+                else:
+                    self._count_miss()
+                    leading[key] = self._flights[key] = _Flight()
+
+        if leading:
+            results.update(self._load_many(leading, loader))
+
+        for key, flight in waiting.items():
+            flight.done.wait()
+            # Another load's failure only fails this key; non-Exception errors
+            # (e.g. KeyboardInterrupt) still propagate
+            error = flight.error or flight.failure
+            if error is not None and not isinstance(error, Exception):
+                raise error
+            if error is not None:
+                results[key] = error  # type: ignore[assignment]
+            else:
+                results[key] = flight.value  # type: ignore[assignment]
+        return results
+
+    def expires_in(self, keys: Iterable[Hashable]) -> float:
+        """
+        Seconds until the first of the keys' entries goes stale.
+
+        Zero or less when an entry is missing or already past its TTL, as
+        for values served stale or as last known good; the full TTL for no
+        keys. Does not count hits or misses.
+        """
+        keys = list(keys)
+        if not keys:
+            return float(self.ttl)
+        entries = self.backend.get_many(keys)
+        if len(entries) < len(set(keys)):
+            return 0.0
+        oldest = min(stored_at for stored_at, _ in entries.values())
+        return self.ttl - (time.time() - oldest)
+
+    def last_known_good(self, key: Hashable) -> T | None:
+        """Return the cached value up to max_fallback_age old, counting a fallback."""
+        entry = self.backend.get(key)
+        if entry is None or time.time() - entry[0] > self.max_fallback_age:
+            return None
+        with self._lock:
+            self._fallback += 1
+            self._fallback_counter.inc()
+        return entry[1]
+
+    def stats(self) -> CacheStats:
+        """Return current counters."""
+        size = len(self.backend)
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                coalesced=self._coalesced,
+                stale=self._stale,
+                fallback=self._fallback,
+                size=size,
+            )
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        self.backend.clear()
+
+    def _count_hit(self) -> None:
+        self._hits += 1
+        self._hit_counter.inc()
+
+    def _count_miss(self) -> None:
+        self._misses += 1
+        self._miss_counter.inc()
+
+    def _count_coalesced(self) -> None:
+        self._coalesced += 1
+        self._coalesced_counter.inc()
+
+    def _count_stale(self) -> None:
+        self._stale += 1
+        self._stale_counter.inc()
+
+    def _load(self, key: Hashable, flight: _Flight[T], loader: Callable[[], T]) -> T:
+        try:
+            value = loader()
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            flight.value = value
+            self.set(key, value)
+            return value
+        finally:
+            self._resolve(key, flight, flight.value)
+
+    def _load_many(
+        self,
+        flights: dict[K, _Flight[T]],
+        loader: Callable[[list[K]], Mapping[K, T | E]],
+    ) -> Mapping[K, T | E]:
+        loaded: Mapping[K, T | E] = {}
+        try:
+            loaded = loader(list(flights))
+        except BaseException as e:
+            for flight in flights.values():
+                flight.error = e
+            raise
+        else:
+            values: dict[Hashable, T] = {}
+            for key, flight in flights.items():
+                result = loaded[key]
+                if isinstance(result, Exception):
+                    flight.failure = result
+                else:
+                    values[key] = flight.value = result
+            self.set_many(values)
+            return loaded
+        finally:
+            for key, flight in flights.items():
+                self._resolve(key, flight, flight.value)
+
+    def _resolve(self, key: Hashable, flight: _Flight[T], value: T | None) -> None:
+        """Publish a flight's result to its waiters and forget the flight."""
+        flight.value = value
+        with self._lock:
+            self._flights.pop(key, None)
+        flight.done.set()
+
+    def _revalidate(
+        self, key: Hashable, flight: _Flight[T], loader: Callable[[], T]
+    ) -> None:
+        try:
+            self._load(key, flight, loader)
+        except Exception:
+            logger.warning("Background revalidation of %r failed", key, exc_info=True)
+
+    def _lookup(self, key: Hashable) -> tuple[T | None, bool]:
+        """Return (value, is_fresh); expired entries are kept but not returned."""
+        entry = self.backend.get(key)
+        if entry is None:
+            return None, False
+        stored_at, value = entry
+        age = time.time() - stored_at
+        if age > self.ttl + self.max_stale:
+            return None, False
+        return value, age <= self.ttl
@@ -0,0 +1,432 @@
+"""Storage backends for TTLCache: in-process, shared memory and Redis."""
+
+import fcntl
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable, Iterator, Mapping
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+from app.config import Settings
+
+if TYPE_CHECKING:
+    from redis import Redis
+
+T = TypeVar("T")
+K = TypeVar("K", bound=Hashable)
+
+logger = logging.getLogger(__name__)
+
+# An entry is the wall-clock time it was stored at and the value
+Entry = tuple[float, T]
+
+
+@dataclass(frozen=True)
+class Codec(Generic[T]):
+    """Converts cache values to and from bytes for out-of-process backends."""
+
+    dumps: Callable[[T], bytes]
+    loads: Callable[[bytes], T]
+
+
+def encode_key(key: Hashable) -> bytes:
+    """Stable byte form of a cache key (tuples of numbers and strings)."""
+    return repr(key).encode()
+
+
+class CacheBackend(ABC, Generic[T]):
+    """
+    Storage for TTLCache entries.
+
+    Backends only store entries and their timestamps; freshness, request
+    coalescing and counters stay in TTLCache. Timestamps are wall-clock
+    (``time.time()``) so entries written by one process can be aged by
+    another. Implementations must be thread-safe.
+    """
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Entry[T] | None:
+        """Return the entry for key, or None."""
+
+    def get_many(self, keys: Iterable[K]) -> dict[K, Entry[T]]:
+        """Return entries for the keys that are present."""
+        found: dict[K, Entry[T]] = {}
+        for key in keys:
+            entry = self.get(key)
+            if entry is not None:
+                found[key] = entry
+        return found
+
+    @abstractmethod
+    def set(self, key: Hashable, value: T, stored_at: float) -> None:
+        """Store a value, evicting older entries if the backend is full."""
+
+    def set_many(self, items: Mapping[Hashable, T], stored_at: float) -> None:
+        """Store several values with the same timestamp."""
+        for key, value in items.items():
+            self.set(key, value, stored_at)
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop all entries."""
+
+    def lock(self, name: str, timeout: float) -> AbstractContextManager[None]:
+        """
+        Exclusive lock held by one process at a time among those sharing
+        the storage, waiting up to ``timeout`` seconds for it.
+
+        Storage private to the process needs no lock, so this is a no-op
+        unless the backend is shared.
+        """
+        return nullcontext()
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored entries."""
+
+
+class MemoryBackend(CacheBackend[T]):
+    """Per-process LRU dictionary; values are stored as-is."""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[Hashable, Entry[T]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Entry[T] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: Hashable, value: T, stored_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (stored_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class MmapBackend(CacheBackend[T]):
+    """
+    Fixed-size hash table in a memory-mapped file shared by local processes.
+
+    Every gunicorn worker on the host maps the same file, so one worker's
+    upstream fetch serves all of them. The table is direct-mapped: a key
+    lives in the slot picked by a stable hash of the key, and a colliding
+    write replaces the previous entry. Slots are guarded by fcntl byte-range
+    locks between processes and a lock between threads. Values larger than
+    a slot are not cached.
+    """
+
+    MAGIC = b"CZWC0001"
+    # key hash, stored_at, key length, value length
+    SLOT_HEADER = struct.Struct("<QdHH")
+    # Seconds between attempts to take a held named lock
+    LOCK_POLL_INTERVAL = 0.05
+
+    def __init__(
+        self, path: str, codec: Codec[T], slots: int, slot_size: int = 256
+    ) -> None:
+        self.path = path
+        self.codec = codec
+        self.slots = slots
+        self.slot_size = slot_size
+        self._lock = threading.Lock()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = len(self.MAGIC) + slots * slot_size
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+        try:
+            # Reset files left by another format or table size
+            if (
+                os.fstat(self._fd).st_size != size
+                or os.pread(self._fd, len(self.MAGIC), 0) != self.MAGIC
+            ):
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, self.MAGIC, 0)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._fd, size)
+
+    def get(self, key: Hashable) -> Entry[T] | None:
+        key_bytes = encode_key(key)
+        key_hash, offset = self._slot(key_bytes)
+        with self._slot_lock(offset, fcntl.LOCK_SH):
+            stored_hash, stored_at, key_len, value_len = self.SLOT_HEADER.unpack_from(
+                self._map, offset
+            )
+            if stored_hash != key_hash or key_len == 0:
+                return None
+            start = offset + self.SLOT_HEADER.size
+            if self._map[start : start + key_len] != key_bytes:
+                return None
+            data = self._map[start + key_len : start + key_len + value_len]
+        return stored_at, self.codec.loads(data)
+
+    def set(self, key: Hashable, value: T, stored_at: float) -> None:
+        key_bytes = encode_key(key)
+        data = self.codec.dumps(value)
+        if self.SLOT_HEADER.size + len(key_bytes) + len(data) > self.slot_size:
+            logger.debug("Value for %r does not fit a cache slot", key)
+            return
+        key_hash, offset = self._slot(key_bytes)
+        header = self.SLOT_HEADER.pack(key_hash, stored_at, len(key_bytes), len(data))
+        record = header + key_bytes + data
+        with self._slot_lock(offset, fcntl.LOCK_EX):
+            self._map[offset : offset + len(record)] = record
+
+    def clear(self) -> None:
+        start = len(self.MAGIC)
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, self.slots * self.slot_size, start)
+            try:
+                self._map[start:] = bytes(self.slots * self.slot_size)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self.slots * self.slot_size, start)
+
+    @contextmanager
+    def lock(self, name: str, timeout: float) -> Iterator[None]:
+        # flock on a separate file, so slot locks are unaffected. flock has no
+        # timeout, so poll; as with Redis, a timed-out caller goes ahead
+        # without the lock rather than waiting on a stuck holder.
+        fd = os.open(f"{self.path}.{name}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        logger.warning(
+                            "Timed out after %.1fs waiting for cache lock %r",
+                            timeout,
+                            name,
+                        )
+                        break
+                    time.sleep(self.LOCK_POLL_INTERVAL)
+            yield
+        finally:
+            os.close(fd)
+
+    def close(self) -> None:
+        """Unmap the table and close the file."""
+        self._map.close()
+        os.close(self._fd)
+
+    def __len__(self) -> int:
+        start = len(self.MAGIC) + struct.calcsize("<Qd")
+        return sum(
+            1
+            for i in range(self.slots)
+            if self._map[start + i * self.slot_size : start + i * self.slot_size + 2]
+            != b"\0\0"
+        )
+
+    def _slot(self, key_bytes: bytes) -> tuple[int, int]:
+        """Return (stable 64-bit key hash, byte offset of the key's slot)."""
+        digest = hashlib.blake2b(key_bytes, digest_size=8).digest()
+        key_hash = int.from_bytes(digest, "little")
+        return key_hash, len(self.MAGIC) + (key_hash % self.slots) * self.slot_size
+
+    def _slot_lock(self, offset: int, mode: int) -> "_SlotLock":
+        return _SlotLock(self._fd, self._lock, offset, self.slot_size, mode)
+
+
+class _SlotLock:
+    """Thread lock plus fcntl range lock on one slot, as a context manager."""
+
+    def __init__(
+        self, fd: int, lock: threading.Lock, offset: int, length: int, mode: int
+    ) -> None:
+        self.fd = fd
+        self.lock = lock
+        self.offset = offset
+        self.length = length
+        self.mode = mode
+
+    def __enter__(self) -> None:
+        self.lock.acquire()
+        try:
+            fcntl.lockf(self.fd, self.mode, self.length, self.offset)
+        except BaseException:
+            self.lock.release()
+            raise
+
+    def __exit__(self, *exc_info: object) -> None:
+        try:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, self.length, self.offset)
+        finally:
+            self.lock.release()
+
+
+class RedisBackend(CacheBackend[T]):
+    """
+    Redis-backed storage shared by all workers and hosts.
+
+    Entries expire after ``retention`` seconds; Redis errors are logged and
+    treated as misses so an unavailable Redis degrades to calling the
+    upstream instead of failing requests. Requires the ``redis`` extra.
+    """
+
+    STORED_AT = struct.Struct("<d")
+
+    # Counting entries scans the keyspace, so a count is reused this long
+    COUNT_TTL = 60.0
+
+    def __init__(
+        self, client: "Redis", name: str, codec: Codec[T], retention: int
+    ) -> None:
+        self.client = client
+        self.prefix = f"czech-weather:{name}:"
+        self.codec = codec
+        self.retention = retention
+        self._count = 0
+        self._counted_at = -math.inf
+
+    def get(self, key: Hashable) -> Entry[T] | None:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[K]) -> dict[K, Entry[T]]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        try:
+            values = self.client.mget([self._key(k) for k in keys])
+        except Exception:
+            logger.warning("Redis cache read failed", exc_info=True)
+            return {}
+        return {
+            key: self._decode(value)
+            for key, value in zip(keys, values, strict=True)
+            if value is not None
+        }
+
+    def set(self, key: Hashable, value: T, stored_at: float) -> None:
+        self.set_many({key: value}, stored_at)
+
+    def set_many(self, items: Mapping[Hashable, T], stored_at: float) -> None:
+        if not items:
+            return
+        header = self.STORED_AT.pack(stored_at)
+        try:
+            with self.client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(
+                        self._key(key),
+                        header + self.codec.dumps(value),
+                        ex=self.retention,
+                    )
+                pipe.execute()
+        except Exception:
+            logger.warning("Redis cache write failed", exc_info=True)
+
+    def clear(self) -> None:
+        try:
+            keys = list(self.client.scan_iter(match=f"{self.prefix}*", count=1000))
+            if keys:
+                self.client.delete(*keys)
+        except Exception:
+            logger.warning("Redis cache clear failed", exc_info=True)
+            return
+        self._count = 0
+        self._counted_at = time.monotonic()
+
+    @contextmanager
+    def lock(self, name: str, timeout: float) -> Iterator[None]:
+        # Expires after timeout so a crashed holder cannot keep it. When Redis
+        # fails or the wait times out, the caller goes ahead without the lock.
+        lock = self.client.lock(
+            f"{self.prefix}lock:{name}", timeout=timeout, blocking_timeout=timeout
+        )
+        try:
+            acquired = lock.acquire()
+        except Exception:
+            logger.warning("Redis cache lock failed", exc_info=True)
+            acquired = False
+        try:
+            yield
+        finally:
+            if acquired:
+                try:
+                    lock.release()
+                except Exception:
+                    logger.warning("Redis cache unlock failed", exc_info=True)
+
+    def __len__(self) -> int:
+        """Approximate entry count, refreshed at most every ``COUNT_TTL``."""
+        now = time.monotonic()
+        if now - self._counted_at < self.COUNT_TTL:
+            return self._count
+        # Stamped before scanning, so concurrent callers reuse the old count
+        self._counted_at = now
+        try:
+            self._count = sum(
+                1 for _ in self.client.scan_iter(match=f"{self.prefix}*", count=1000)
+            )
+        except Exception:
+            logger.warning("Redis cache count failed", exc_info=True)
+        return self._count
+
+    def _key(self, key: Hashable) -> str:
+        return self.prefix + encode_key(key).decode()
+
+    def _decode(self, data: Any) -> Entry[T]:
+        (stored_at,) = self.STORED_AT.unpack_from(data)
+        return stored_at, self.codec.loads(data[self.STORED_AT.size :])
+
+
+def create_cache_backend(
+    settings: Settings, name: str, codec: Codec[T], allow_mmap: bool = True
+) -> CacheBackend[T]:
+    """
+    Create the cache backend selected by ``weather_cache_backend``.
+
+    Args:
+        settings: Application settings
+        name: Cache name, used for Redis key prefixes and mmap file names
+        codec: Value serializer for out-of-process backends
+        allow_mmap: Whether values are small enough for mmap slots; large
+            values fall back to the in-process backend with ``mmap``
+    """
+    backend = settings.weather_cache_backend
+    max_size = settings.weather_cache_max_size
+    if backend == "redis":
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "WEATHER_CACHE_BACKEND=redis requires the 'redis' extra"
+            ) from e
+        client = redis.Redis.from_url(settings.weather_cache_redis_url)
+        # Keep entries past the TTL for as long as they may serve as fallbacks
+        retention = max(
+            settings.weather_cache_ttl + settings.weather_cache_max_stale,
+            settings.weather_cache_max_fallback_age,
+        )
+        return RedisBackend(client, name, codec, retention)
+    if backend == "mmap" and allow_mmap:
+        directory = settings.weather_cache_mmap_dir or tempfile.gettempdir()
+        path = os.path.join(directory, f"czech-weather-{name}.cache")
+        # Twice as many slots as entries keeps collisions rare
+        return MmapBackend(path, codec, slots=max_size * 2)
+    return MemoryBackend(max_size)
@@ -0,0 +1,109 @@
+"""Nearest-city lookup with an in-memory k-d tree."""
+
+import math
+from array import array
+from collections.abc import Sequence
+
+from app.models import City
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _unit_vector(latitude: float, longitude: float) -> tuple[float, float, float]:
+    phi, lam = math.radians(latitude), math.radians(longitude)
+    cos_phi = math.cos(phi)
+    return cos_phi * math.cos(lam), cos_phi * math.sin(lam), math.sin(phi)
+
+
+class CityIndex:
+    """
+    Immutable k-d tree over city positions for nearest-neighbour queries.
+
+    Cities are stored as 3D unit vectors, where straight-line (chord)
+    distance grows monotonically with great-circle distance, so the search is
+    exact everywhere on the globe without special cases for the poles or the
+    antimeridian. The tree is implicit: cities are arranged in one array so
+    that each subrange's middle element splits it on the axis for its depth.
+    Building is O(n log² n) and queries visit O(log n) nodes on average.
+    """
+
+    def __init__(self, cities: Sequence[City]) -> None:
+        points = [
+            (*_unit_vector(c.latitude, c.longitude), i) for i, c in enumerate(cities)
+        ]
+        self._arrange(points, 0, len(points), 0)
+        self._cities = tuple(cities[p[3]] for p in points)
+        self._coords = (
+            array("d", (p[0] for p in points)),
+            array("d", (p[1] for p in points)),
+            array("d", (p[2] for p in points)),
+        )
+
+    def __len__(self) -> int:
+        return len(self._cities)
+
+    def nearest(self, latitude: float, longitude: float) -> tuple[City, float] | None:
+        """
+        Find the city closest to the given coordinates.
+
+        Returns:
+            (city, distance in km), or None if the index is empty
+        """
+        if not self._cities:
+            return None
+        target = _unit_vector(latitude, longitude)
+        best = self._search(target, 0, len(self._cities), 0, (-1, math.inf))[0]
+        city = self._cities[best]
+        return city, haversine_km(latitude, longitude, city.latitude, city.longitude)
+
+    def _search(
+        self,
+        target: tuple[float, float, float],
+        lo: int,
+        hi: int,
+        depth: int,
+        best: tuple[int, float],
+    ) -> tuple[int, float]:
+        """Return (index, squared chord distance) of the best match so far."""
+        if lo >= hi:
+            return best
+        mid = (lo + hi) // 2
+        xs, ys, zs = self._coords
+        dx, dy, dz = target[0] - xs[mid], target[1] - ys[mid], target[2] - zs[mid]
+        distance = dx * dx + dy * dy + dz * dz
+        if distance < best[1]:
+            best = (mid, distance)
+
+        axis = depth % 3
+        delta = target[axis] - self._coords[axis][mid]
+        near, far = (
+            ((lo, mid), (mid + 1, hi)) if delta < 0 else ((mid + 1, hi), (lo, mid))
+        )
+        best = self._search(target, *near, depth + 1, best)
+        if delta * delta < best[1]:
+            best = self._search(target, *far, depth + 1, best)
+        return best
+
+    @classmethod
+    def _arrange(
+        cls, points: list[tuple[float, float, float, int]], lo: int, hi: int, depth: int
+    ) -> None:
+        if hi - lo <= 1:
+            return
+        axis = depth % 3
+        points[lo:hi] = sorted(points[lo:hi], key=lambda p: p[axis])
+        mid = (lo + hi) // 2
+        cls._arrange(points, lo, mid, depth + 1)
+        cls._arrange(points, mid + 1, hi, depth + 1)
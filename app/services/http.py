@@ -0,0 +1,66 @@
+"""Shared HTTP client for upstream APIs."""
+
+import atexit
+import os
+import threading
+from typing import TYPE_CHECKING
+
+from app.config import Settings
+
+if TYPE_CHECKING:
+    import httpx
+
+_client: "httpx.Client | None" = None
+_client_lock = threading.Lock()
+
+
+def get_http_client(settings: Settings) -> "httpx.Client":
+    """
+    Get the process-wide HTTP client, creating it on first use.
+
+    Importing httpx and building its TLS context is deferred to the first
+    upstream call, so app startup and requests that never call Open-Meteo
+    don't pay for it. The client is closed when the process exits.
+    """
+    global _client
+    client = _client
+    if client is not None:
+        return client
+
+    with _client_lock:
+        if _client is None:
+            _client = create_http_client(settings)
+            atexit.register(_client.close)
+        return _client
+
+
+def _reset_after_fork() -> None:
+    """Give a forked child its own client instead of the parent's sockets."""
+    global _client, _client_lock
+    _client = None
+    _client_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def create_http_client(settings: Settings) -> "httpx.Client":
+    """
+    Create a keep-alive, connection-pooled HTTP client.
+
+    One client is shared by all requests in a worker process so upstream
+    calls reuse open TCP/TLS connections instead of handshaking every time.
+    HTTP/2 requires the optional ``h2`` package (``czech-weather[http2]``).
+    """
+    import httpx
+
+    limits = httpx.Limits(
+        max_connections=settings.weather_api_max_connections,
+        max_keepalive_connections=settings.weather_api_max_keepalive,
+        keepalive_expiry=settings.weather_api_keepalive_expiry,
+    )
+    return httpx.Client(
+        timeout=settings.weather_api_timeout,
+        limits=limits,
+        http2=settings.weather_api_http2,
+    )
@@ -0,0 +1,139 @@
+"""In-memory snapshot of reference data (cities and weather codes)."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from sqlmodel import Session
+
+from app.models import City, WeatherCode
+from app.services.geo import CityIndex
+from app.services.repository import Repository
+from app.services.search import CitySearchIndex
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    """Immutable, indexed snapshot of the reference tables."""
+
+    version: str
+    cities: tuple[City, ...]
+    cities_by_name: Mapping[str, City]
+    city_index: CityIndex
+    city_search: CitySearchIndex
+    weather_codes: Mapping[int, str]
+
+    @classmethod
+    def build(
+        cls, version: str, cities: Iterable[City], weather_codes: Iterable[WeatherCode]
+    ) -> "ReferenceData":
+        """Build a snapshot from cities (in display order) and weather codes."""
+        ordered = tuple(cities)
+        codes = {c.code: c.description for c in weather_codes}
+        return cls(
+            version=version,
+            cities=ordered,
+            cities_by_name=MappingProxyType({c.name: c for c in ordered}),
+            city_index=CityIndex(ordered),
+            city_search=CitySearchIndex(ordered),
+            weather_codes=MappingProxyType(codes),
+        )
+
+    @classmethod
+    def load(cls, repository: Repository) -> "ReferenceData":
+        """Build a snapshot from the database."""
+        return cls.build(
+            version=repository.get_reference_version(),
+            cities=repository.get_all_cities(),
+            weather_codes=repository.get_all_weather_codes(),
+        )
+
+
+class ReferenceDataStore:
+    """
+    Process-wide holder of the current reference data snapshot.
+
+    The snapshot is loaded on first use and swapped atomically when the
+    database fingerprint changes. Version checks run at most once per
+    refresh interval and only in one thread; other threads keep reading the
+    current snapshot while the check is in progress. City objects are
+    shared between threads and must be treated as read-only.
+    """
+
+    def __init__(
+        self, session_factory: Callable[[], Session], refresh_interval: float
+    ) -> None:
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self._snapshot: ReferenceData | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> ReferenceData:
+        """Return the current snapshot, loading or refreshing as needed."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load()
+                    self._checked_at = time.monotonic()
+                return self._snapshot
+
+        if time.monotonic() - self._checked_at > self.refresh_interval:
+            self.refresh()
+        return self._snapshot or snapshot
+
+    def preload(self, snapshot: ReferenceData) -> None:
+        """
+        Install a snapshot built elsewhere, e.g. from seed data in benchmarks.
+
+        It counts as just checked, so the database is next consulted after
+        the refresh interval.
+        """
+        with self._lock:
+            self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reload the snapshot if the database version changed.
+
+        Args:
+            force: Reload even if the version is unchanged
+
+        Returns:
+            True if a new snapshot was installed
+        """
+        if not self._lock.acquire(blocking=force):
+            return False
+        try:
+            self._checked_at = time.monotonic()
+            with self.session_factory() as session:
+                repository = Repository(session)
+                current = self._snapshot
+                if (
+                    not force
+                    and current is not None
+                    and repository.get_reference_version() == current.version
+                ):
+                    return False
+                self._snapshot = ReferenceData.load(repository)
+            logger.info("Reference data reloaded (version %s)", self._snapshot.version)
+            return True
+        except Exception:
+            if self._snapshot is None:
+                raise
+            logger.warning("Reference data refresh failed", exc_info=True)
+            return False
+        finally:
+            self._lock.release()
+
+    def _load(self) -> ReferenceData:
+        with self.session_factory() as session:
+            return ReferenceData.load(Repository(session))
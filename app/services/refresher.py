@@ -0,0 +1,143 @@
+"""Background refresher that keeps current weather warm for all cities."""
+
+import logging
+import threading
+from collections.abc import Callable
+
+from sqlmodel import Session
+
+from app.config import Settings
+from app.models import WeatherData, WeatherObservation
+from app.services.broadcast import WeatherBroadcaster
+from app.services.cache import TTLCache
+from app.services.reference import ReferenceDataStore
+from app.services.repository import Repository
+from app.services.resilience import UpstreamPolicy
+from app.services.weather import WeatherAPIError, WeatherService
+
+logger = logging.getLogger(__name__)
+
+
+class WeatherRefresher:
+    """
+    Daemon thread that refreshes current weather for every city.
+
+    Each pass fetches all cities with multi-location requests and stores the
+    results in the shared weather cache, so user requests are served from
+    cache instead of waiting on Open-Meteo. Readings are also kept in the
+    weather_observations table when history is enabled, and changed readings
+    are published to live stream clients through the broadcaster.
+
+    Every worker runs a refresher, but with a shared cache backend (mmap or
+    Redis) passes are serialized by the backend's lock and a pass reuses
+    entries another worker stored less than half an interval ago. One worker
+    then calls Open-Meteo and records history per interval, while the others
+    only publish the shared readings to their own stream clients. With the
+    in-process backend each worker keeps its own cache warm.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        session_factory: Callable[[], Session],
+        reference: ReferenceDataStore,
+        cache: TTLCache[WeatherData],
+        upstream: UpstreamPolicy | None = None,
+        broadcaster: WeatherBroadcaster | None = None,
+    ) -> None:
+        self.settings = settings
+        self.session_factory = session_factory
+        self.reference = reference
+        self.cache = cache
+        self.upstream = upstream
+        self.broadcaster = broadcaster
+        self.interval = settings.weather_refresh_interval
+        self.record_history = settings.weather_history_enabled
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the refresh loop in a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="weather-refresher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the refresh loop and wait for the current pass to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.settings.weather_api_timeout)
+            self._thread = None
+
+    def refresh(self) -> int:
+        """
+        Refresh current weather for all cities once.
+
+        Returns:
+            Number of cities with current weather, fetched or reused
+        """
+        with self.session_factory() as session:
+            repository = Repository(session, self.reference)
+            service = WeatherService(
+                self.settings,
+                repository,
+                cache=self.cache,
+                upstream=self.upstream,
+            )
+            cities = repository.get_all_cities()
+            keys = [service.cache_key(c.latitude, c.longitude) for c in cities]
+
+            # Held until the results are cached, so workers waiting on the
+            # lock find them and skip the fetch
+            with self.cache.lock("refresh", timeout=self.interval):
+                recent = self.cache.get_recent(keys, max_age=self.interval / 2)
+                stale = [
+                    c for c, k in zip(cities, keys, strict=True) if k not in recent
+                ]
+                refreshed = service.refresh_current_weather_batch(
+                    [(c.latitude, c.longitude) for c in stale]
+                )
+            fetched = {c.name: w for c, w in zip(stale, refreshed, strict=True)}
+
+            if self.record_history:
+                repository.upsert_observations(
+                    WeatherObservation.from_weather(city.id, weather)
+                    for city, weather in zip(stale, refreshed, strict=True)
+                    if city.id is not None and isinstance(weather, WeatherData)
+                )
+                session.commit()
+
+        results = {
+            city.name: fetched[city.name] if city.name in fetched else recent[key]
+            for city, key in zip(cities, keys, strict=True)
+        }
+        if self.broadcaster is not None:
+            self.broadcaster.publish(
+                {
+                    name: weather
+                    for name, weather in results.items()
+                    if isinstance(weather, WeatherData)
+                }
+            )
+
+        errors = [r for r in fetched.values() if isinstance(r, WeatherAPIError)]
+        if errors:
+            logger.warning(
+                "Weather refresh failed for %d of %d cities: %s",
+                len(errors),
+                len(results),
+                errors[0],
+            )
+        return len(results) - len(errors)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Weather refresh failed")
+            self._stop.wait(self.interval)
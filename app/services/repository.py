@@ -1,31 +1,359 @@
 """Repository service for database access."""
 
-from sqlmodel import Session, select
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import TYPE_CHECKING, Any
 
-from app.models import City, WeatherCode
+from sqlmodel import Session, col, func, or_, select, text
+
+from app.models import City, WeatherCode, WeatherObservation
+from app.services.geo import CityIndex
+from app.services.search import fold
+
+if TYPE_CHECKING:
+    from app.services.reference import ReferenceDataStore
+
+REFERENCE_VERSION_SQL = text(
+    """
+    SELECT md5(
+        coalesce((
+            SELECT string_agg(
+                concat_ws(':', id, name, latitude, longitude), ',' ORDER BY id
+            )
+            FROM cities
+        ), '')
+        || '|' ||
+        coalesce((
+            SELECT string_agg(concat_ws(':', code, description), ',' ORDER BY code)
+            FROM weather_codes
+        ), '')
+    )
+    """
+)
+
+OBSERVATION_COLUMNS = (
+    "city_id",
+    "observed_at",
+    "temperature",
+    "windspeed",
+    "winddirection",
+    "weathercode",
+)
+
+# Each row binds one parameter per column; PostgreSQL allows 65535 per statement
+OBSERVATION_UPSERT_CHUNK = 65535 // len(OBSERVATION_COLUMNS)
+
+ObservationRow = tuple[int, datetime, float, float, int, int]
+
+CITY_COLUMNS = ("name", "latitude", "longitude")
+WEATHER_CODE_COLUMNS = ("code", "description")
+
+CityRow = tuple[str, float, float]
+WeatherCodeRow = tuple[int, str]
+
+
+@dataclass(frozen=True)
+class SyncResult:
+    """Row counts of a reference table sync."""
+
+    inserted: int
+    updated: int
+    deleted: int
+    unchanged: int
 
 
 class Repository:
-    """Unified repository for all database operations."""
+    """
+    Unified repository for all database operations.
 
-    def __init__(self, session: Session) -> None:
-        self.session = session
+    When a reference data store is given, city and weather code lookups are
+    answered from its in-memory snapshot instead of querying the database.
+    With a session factory, the session is only opened when a query needs it.
+    """
+
+    def __init__(
+        self,
+        session: Session | None = None,
+        reference: "ReferenceDataStore | None" = None,
+        *,
+        session_factory: Callable[[], Session] | None = None,
+    ) -> None:
+        self._session = session
+        self._session_factory = session_factory
+        self.reference = reference
+
+    @property
+    def session(self) -> Session:
+        """Database session, opened from the session factory on first use."""
+        if self._session is None:
+            if self._session_factory is None:
+                raise RuntimeError("Repository has no session or session factory")
+            self._session = self._session_factory()
+        return self._session
+
+    def close(self) -> None:
+        """Close the session if one was opened from the session factory."""
+        if self._session is not None and self._session_factory is not None:
+            self._session.close()
+            self._session = None
 
     # City methods
 
     def get_all_cities(self) -> list[City]:
         """Get all cities ordered by name."""
+        if self.reference is not None:
+            return list(self.reference.snapshot.cities)
         return list(self.session.exec(select(City).order_by(City.name)).all())
 
     def get_city_by_name(self, name: str) -> City | None:
         """Find city by name."""
+        if self.reference is not None:
+            return self.reference.snapshot.cities_by_name.get(name)
         return self.session.exec(select(City).where(City.name == name)).first()
 
+    def get_cities_by_names(self, names: Sequence[str]) -> dict[str, City]:
+        """Find many cities by name in a single lookup, keyed by name."""
+        if self.reference is not None:
+            by_name = self.reference.snapshot.cities_by_name
+            return {n: by_name[n] for n in names if n in by_name}
+        cities = self.session.exec(select(City).where(col(City.name).in_(names)))
+        return {c.name: c for c in cities}
+
+    def get_nearest_city(
+        self, latitude: float, longitude: float
+    ) -> tuple[City, float] | None:
+        """Find the city closest to the coordinates, with its distance in km."""
+        if self.reference is not None:
+            return self.reference.snapshot.city_index.nearest(latitude, longitude)
+        return CityIndex(self.get_all_cities()).nearest(latitude, longitude)
+
+    def search_cities(self, query: str, limit: int = 10) -> list[City]:
+        """
+        Find cities by a diacritic-insensitive name prefix, best matches first.
+
+        Names starting with the query come first, then names with a later
+        word starting with it, both alphabetically; names similar to the query
+        (typos) are only returned when no name starts with it, as in
+        CitySearchIndex. Without a reference store this uses the trigram
+        index from migration 003.
+        """
+        if self.reference is not None:
+            return self.reference.snapshot.city_search.search(query, limit)
+        folded = fold(query)
+        if not folded or limit <= 0:
+            return []
+        key = func.f_unaccent(func.lower(City.name))
+        name_prefix = key.startswith(folded, autoescape=True)
+        word_prefix = key.contains(f" {folded}", autoescape=True)
+        prefix_stmt = (
+            select(City)
+            .where(or_(name_prefix, word_prefix))
+            .order_by(name_prefix.desc(), key)
+            .limit(limit)
+        )
+        cities = list(self.session.exec(prefix_stmt))
+        if cities:
+            return cities
+        similar_stmt = (
+            select(City)
+            .where(key.op("%")(folded))
+            .order_by(func.similarity(key, folded).desc(), key)
+            .limit(limit)
+        )
+        return list(self.session.exec(similar_stmt))
+
     # WeatherCode methods
 
+    def get_all_weather_codes(self) -> list[WeatherCode]:
+        """Get all weather codes ordered by code."""
+        return list(
+            self.session.exec(select(WeatherCode).order_by(col(WeatherCode.code)))
+        )
+
     def get_weather_description(self, code: int) -> str:
         """Get weather description by code."""
+        if self.reference is not None:
+            return self.reference.snapshot.weather_codes.get(code, "Unknown")
         weather_code = self.session.exec(
             select(WeatherCode).where(WeatherCode.code == code)
         ).first()
         return weather_code.description if weather_code else "Unknown"
+
+    # Reference data methods
+
+    def get_reference_version(self) -> str:
+        """Get a fingerprint of the cities and weather_codes tables."""
+        if self.reference is not None:
+            return self.reference.snapshot.version
+        result = self.session.exec(REFERENCE_VERSION_SQL)  # type: ignore[call-overload]
+        return str(result.scalar_one())
+
+    def sync_cities(self, rows: Iterable[CityRow], prune: bool = True) -> SyncResult:
+        """
+        Make the cities table match the given rows, keyed by name.
+
+        See ``sync_weather_codes``; city ids are kept for existing names, and
+        deleting a city also deletes its recorded observations.
+
+        Args:
+            rows: Tuples in ``CITY_COLUMNS`` order
+            prune: Delete cities missing from rows
+        """
+        return self._sync_reference_table("cities", CITY_COLUMNS, rows, prune)
+
+    def sync_weather_codes(
+        self, rows: Iterable[WeatherCodeRow], prune: bool = True
+    ) -> SyncResult:
+        """
+        Make the weather_codes table match the given rows, keyed by code.
+
+        Rows are streamed into a staging table with COPY and merged with one
+        INSERT ... ON CONFLICT that skips unchanged rows. Nothing is visible
+        to other sessions until the caller commits, so readers never see a
+        partially loaded or empty table. If a key repeats, the last row wins.
+
+        Args:
+            rows: Tuples in ``WEATHER_CODE_COLUMNS`` order
+            prune: Delete codes missing from rows
+
+        Raises:
+            ValueError: If rows is empty and prune is set
+        """
+        return self._sync_reference_table(
+            "weather_codes", WEATHER_CODE_COLUMNS, rows, prune
+        )
+
+    def _sync_reference_table(
+        self, table: str, columns: Sequence[str], rows: Iterable[Any], prune: bool
+    ) -> SyncResult:
+        """Merge rows into a table keyed by its first column; the caller commits."""
+        key = columns[0]
+        column_list = ", ".join(columns)
+        staging = f"{table}_staging"
+        changed = ", ".join(f"{table}.{c}" for c in columns[1:])
+        excluded = ", ".join(f"EXCLUDED.{c}" for c in columns[1:])
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns[1:])
+        connection = self.session.connection().connection.driver_connection
+        if connection is None:
+            raise RuntimeError("Database connection is closed")
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {staging} ON COMMIT DROP AS "
+                f"SELECT {column_list} FROM {table} WITH NO DATA"
+            )
+            with cursor.copy(f"COPY {staging} ({column_list}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+
+            cursor.execute(f"SELECT count(DISTINCT {key}) FROM {staging}")
+            (staged,) = cursor.fetchone() or (0,)
+            if staged == 0 and prune:
+                raise ValueError(f"No rows to sync; refusing to empty {table}")
+
+            # Rows appended by COPY are in input order, so the highest ctid
+            # of a key is its last occurrence. xmax is 0 for inserted rows.
+            cursor.execute(
+                f"WITH merged AS ("
+                f"INSERT INTO {table} ({column_list}) "
+                f"SELECT DISTINCT ON ({key}) {column_list} FROM {staging} "
+                f"ORDER BY {key}, ctid DESC "
+                f"ON CONFLICT ({key}) DO UPDATE SET {updates} "
+                f"WHERE ({changed}) IS DISTINCT FROM ({excluded}) "
+                f"RETURNING (xmax = 0) AS inserted) "
+                f"SELECT count(*) FILTER (WHERE inserted), "
+                f"count(*) FILTER (WHERE NOT inserted) FROM merged"
+            )
+            inserted, updated = cursor.fetchone() or (0, 0)
+
+            deleted = 0
+            if prune:
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE NOT EXISTS "
+                    f"(SELECT 1 FROM {staging} s WHERE s.{key} = {table}.{key})"
+                )
+                deleted = cursor.rowcount
+            cursor.execute(f"TRUNCATE {staging}")
+
+        return SyncResult(
+            inserted=inserted,
+            updated=updated,
+            deleted=deleted,
+            unchanged=staged - inserted - updated,
+        )
+
+    # WeatherObservation methods
+
+    def upsert_observations(self, observations: Iterable[WeatherObservation]) -> int:
+        """
+        Insert or update observations with multi-row INSERT ... ON CONFLICT.
+
+        Rows are sent in as few statements as the bind parameter limit allows;
+        the caller commits.
+
+        Returns:
+            Number of rows written
+        """
+        from sqlalchemy.dialects.postgresql import insert
+
+        table = WeatherObservation.__table__  # type: ignore[attr-defined]
+        count = 0
+        iterator = iter(observations)
+        while chunk := list(islice(iterator, OBSERVATION_UPSERT_CHUNK)):
+            # A statement may not update the same row twice, so dedupe first
+            rows = {(o.city_id, o.observed_at): o.model_dump() for o in chunk}
+            stmt = insert(table).values(list(rows.values()))
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["city_id", "observed_at"],
+                set_={c: stmt.excluded[c] for c in OBSERVATION_COLUMNS[2:]},
+            )
+            self.session.execute(stmt)
+            count += len(rows)
+        return count
+
+    def copy_observations(self, rows: Iterable[ObservationRow]) -> int:
+        """
+        Stream observation rows into the table with COPY and a single merge.
+
+        Rows are copied into a temporary staging table and upserted with one
+        INSERT ... SELECT, so arbitrarily large iterables are ingested without
+        being materialized. When an hour of a city appears more than once,
+        the last row wins. The caller commits.
+
+        Args:
+            rows: Tuples in ``OBSERVATION_COLUMNS`` order
+
+        Returns:
+            Number of rows copied
+        """
+        columns = ", ".join(OBSERVATION_COLUMNS)
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in OBSERVATION_COLUMNS[2:])
+        connection = self.session.connection().connection.driver_connection
+        if connection is None:
+            raise RuntimeError("Database connection is closed")
+
+        count = 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS weather_observations_staging "
+                "(LIKE weather_observations) ON COMMIT DROP"
+            )
+            with cursor.copy(
+                f"COPY weather_observations_staging ({columns}) FROM STDIN"
+            ) as copy:
+                for row in rows:
+                    copy.write_row(row)
+                    count += 1
+            # ON CONFLICT cannot update a row twice in one statement, so keep
+            # one row per key: the last copied (highest ctid) of each
+            cursor.execute(
+                f"INSERT INTO weather_observations ({columns}) "
+                f"SELECT DISTINCT ON (city_id, observed_at) {columns} "
+                f"FROM weather_observations_staging "
+                f"ORDER BY city_id, observed_at, ctid DESC "
+                f"ON CONFLICT (city_id, observed_at) DO UPDATE SET {updates}"
+            )
+            cursor.execute("TRUNCATE weather_observations_staging")
+        return count
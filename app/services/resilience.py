@@ -0,0 +1,324 @@
+"""Circuit breaker, retries and hedged requests for upstream API calls."""
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TypeVar
+
+from app.config import Settings
+from app.metrics import CIRCUIT_STATE, UPSTREAM_RETRIES
+from app.services.admission import ConcurrencyLimiter
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# Successful calls needed before the p95 latency is trusted for hedging
+MIN_LATENCY_SAMPLES = 20
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open."""
+
+    pass
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether an error suggests the upstream is unhealthy (not a bad request)."""
+    import httpx
+
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(error, httpx.TransportError)
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker with half-open probing.
+
+    The circuit opens after ``failure_threshold`` consecutive failures, where
+    calls slower than ``slow_call_threshold`` also count as failures. While
+    open, calls are rejected without touching the upstream. After
+    ``reset_timeout`` seconds a single probe call is let through: success
+    closes the circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+    _GAUGE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        slow_call_threshold: float = 0.0,
+        window: int = 200,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.slow_call_threshold = slow_call_threshold
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._gauge = CIRCUIT_STATE.labels(name)
+        self._gauge.set(0)
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the timeout passed."""
+        with self._lock:
+            if (
+                self._state == self.OPEN
+                and time.monotonic() - self._opened_at >= self.reset_timeout
+            ):
+                self._set_state(self.HALF_OPEN)
+            return self._state
+
+    def allow(self) -> str | None:
+        """
+        Admit a call; half-open admits one probe at a time.
+
+        Returns:
+            The state the call was admitted in (HALF_OPEN for the probe, which
+            the caller must pass on as ``probe``), or None if rejected
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return state
+        if state == self.OPEN:
+            return None
+        with self._lock:
+            if self._probing:
+                return None
+            self._probing = True
+            return state
+
+    def record_success(self, duration: float, probe: bool = False) -> None:
+        """Record a completed call and its duration."""
+        if self.slow_call_threshold and duration > self.slow_call_threshold:
+            self.record_failure(probe)
+            return
+        with self._lock:
+            self._latencies.append(duration)
+            self._failures = 0
+            if probe:
+                self._probing = False
+            if self._state != self.CLOSED:
+                logger.info("Circuit %s closed", self.name)
+                self._set_state(self.CLOSED)
+
+    def record_failure(self, probe: bool = False) -> None:
+        """Record a failed call, opening the circuit past the threshold."""
+        with self._lock:
+            self._failures += 1
+            if probe:
+                self._probing = False
+            if self.failure_threshold <= 0:
+                return
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED and self._failures >= self.failure_threshold
+            ):
+                logger.warning(
+                    "Circuit %s opened after %d failures", self.name, self._failures
+                )
+                self._opened_at = time.monotonic()
+                self._set_state(self.OPEN)
+
+    def release_probe(self) -> None:
+        """
+        Free the half-open probe slot taken by allow.
+
+        Only the probe may call this. Recording its outcome already frees the
+        slot; this covers a probe that ends without one, e.g. interrupted by
+        a BaseException, which would otherwise leave the circuit half-open
+        and rejecting every call.
+        """
+        with self._lock:
+            self._probing = False
+
+    def latency_quantile(self, quantile: float) -> float | None:
+        """Quantile of recent successful call durations, None if too few."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(quantile * len(samples)))]
+
+    def _set_state(self, state: str) -> None:
+        self._state = state
+        self._gauge.set(self._GAUGE_VALUES[state])
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Bounded retries with full-jitter exponential backoff."""
+
+    retries: int
+    backoff: float
+    backoff_max: float
+    budget: float
+
+    def delay(self, attempt: int) -> float:
+        """Random delay before retry number ``attempt`` (0-based)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2**attempt))
+
+
+class UpstreamPolicy:
+    """
+    Process-wide protection for calls to a slow or failing upstream.
+
+    Each call passes the circuit breaker, is retried on transient errors
+    (connection failures, 5xx, 429) within the retry budget, and, with
+    hedging enabled, is duplicated once the first attempt takes longer than
+    the recent p95 latency; the first successful response wins. Timeouts are
+    not retried, so a stalled upstream costs a worker at most one timeout
+    before the circuit opens.
+
+    The caller holds one limiter slot for its call; a hedge is a second
+    upstream request, so it is only sent if it can take a slot of its own.
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        retry: RetryPolicy,
+        hedge: bool = False,
+        max_workers: int = 10,
+    ) -> None:
+        self.breaker = breaker
+        self.retry = retry
+        self.hedge = hedge
+        self._executor: ThreadPoolExecutor | None = None
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+
+    def call(self, fn: Callable[[], T], limiter: ConcurrencyLimiter | None = None) -> T:
+        """
+        Run fn under the breaker, retry and hedging rules.
+
+        Args:
+            fn: The upstream request
+            limiter: Cap on concurrent upstream calls that hedges count against
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            Exception: The last error raised by fn
+        """
+        import httpx
+
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            admitted = self.breaker.allow()
+            if admitted is None:
+                raise CircuitOpenError(f"Circuit {self.breaker.name} is open")
+            probe = admitted == CircuitBreaker.HALF_OPEN
+
+            call_started = time.perf_counter()
+            try:
+                result = self._hedged(fn, limiter) if self.hedge else fn()
+            except Exception as e:
+                if not is_transient(e):
+                    # The upstream answered; the request itself was bad
+                    self.breaker.record_success(
+                        time.perf_counter() - call_started, probe
+                    )
+                    raise
+                self.breaker.record_failure(probe)
+                delay = self.retry.delay(attempt)
+                if (
+                    attempt >= self.retry.retries
+                    or isinstance(e, httpx.TimeoutException)
+                    or time.monotonic() - started + delay > self.retry.budget
+                ):
+                    raise
+            else:
+                self.breaker.record_success(time.perf_counter() - call_started, probe)
+                return result
+            finally:
+                if probe:
+                    self.breaker.release_probe()
+
+            UPSTREAM_RETRIES.labels("retry").inc()
+            attempt += 1
+            time.sleep(delay)
+
+    def shutdown(self) -> None:
+        """Stop the hedging threads."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _hedged(self, fn: Callable[[], T], limiter: ConcurrencyLimiter | None) -> T:
+        """Run fn, starting a duplicate if it outlives the recent p95 latency."""
+        delay = self.breaker.latency_quantile(0.95)
+        if delay is None:
+            return fn()
+
+        executor = self._get_executor()
+        primary = executor.submit(fn)
+        done, _ = wait([primary], timeout=delay)
+        if done or (limiter is not None and not limiter.try_acquire()):
+            return primary.result()
+
+        UPSTREAM_RETRIES.labels("hedge").inc()
+        hedge = executor.submit(fn)
+        if limiter is not None:
+            # The caller gives its slot back on return while the losing request
+            # may still run, so the hedge's slot is kept until both are done
+            primary.add_done_callback(
+                lambda _: hedge.add_done_callback(lambda _: limiter.release())
+            )
+        pending: set[Future[T]] = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+        # Both attempts failed; report the primary's error
+        return primary.result()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created on first use so no threads exist before a fork
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="weather-hedge"
+                )
+            return self._executor
+
+
+def create_upstream_policy(settings: Settings) -> UpstreamPolicy:
+    """Create the Open-Meteo call policy from settings."""
+    breaker = CircuitBreaker(
+        "open-meteo",
+        failure_threshold=settings.weather_api_circuit_threshold,
+        reset_timeout=settings.weather_api_circuit_reset,
+        slow_call_threshold=settings.weather_api_slow_call,
+    )
+    retry = RetryPolicy(
+        retries=settings.weather_api_retries,
+        backoff=settings.weather_api_retry_backoff,
+        backoff_max=settings.weather_api_retry_backoff_max,
+        budget=settings.weather_api_timeout,
+    )
+    return UpstreamPolicy(
+        breaker,
+        retry,
+        hedge=settings.weather_api_hedge,
+        max_workers=settings.weather_api_max_connections,
+    )
@@ -0,0 +1,110 @@
+"""Diacritic-insensitive city name search."""
+
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from collections.abc import Iterator, Sequence
+
+from app.models import City
+
+# Same cut-off as pg_trgm's default similarity_threshold
+SIMILARITY_THRESHOLD = 0.3
+
+
+def fold(text: str) -> str:
+    """Lower-case text, strip diacritics and collapse whitespace."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.split())
+
+
+def trigrams(folded: str) -> set[str]:
+    """Trigrams of each word, padded like pg_trgm (two spaces before, one after)."""
+    grams: set[str] = set()
+    for word in folded.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class CitySearchIndex:
+    """
+    Immutable prefix and trigram index over city names.
+
+    Names are folded ("České Budějovice" -> "ceske budejovice") and kept in
+    two sorted arrays searched with bisect: whole names, and the tail of a
+    name from each later word ("budejovice"), so "ceske bud" and "bud" both
+    find it. Queries with no prefix match fall back to trigram similarity
+    (as pg_trgm computes it) through an inverted index, which tolerates
+    typos such as "Olomuc".
+    """
+
+    def __init__(self, cities: Sequence[City]) -> None:
+        self._cities = tuple(cities)
+        names: list[tuple[str, int]] = []
+        words: list[tuple[str, int]] = []
+        postings: defaultdict[str, list[int]] = defaultdict(list)
+        self._trigram_counts: list[int] = []
+        for i, city in enumerate(self._cities):
+            folded = fold(city.name)
+            names.append((folded, i))
+            parts = folded.split(" ")
+            for start in range(1, len(parts)):
+                words.append((" ".join(parts[start:]), i))
+            grams = trigrams(folded)
+            for gram in grams:
+                postings[gram].append(i)
+            self._trigram_counts.append(len(grams))
+        names.sort()
+        words.sort()
+        self._names = [key for key, _ in names]
+        self._name_ids = [i for _, i in names]
+        self._words = [key for key, _ in words]
+        self._word_ids = [i for _, i in words]
+        self._postings = dict(postings)
+
+    def __len__(self) -> int:
+        return len(self._cities)
+
+    def search(self, query: str, limit: int = 10) -> list[City]:
+        """
+        Find cities matching a query, best matches first.
+
+        Whole-name prefix matches come first (an exact match leads), then
+        matches on a later word of the name, both alphabetically; fuzzy
+        matches are only returned when no name starts with the query.
+        """
+        folded = fold(query)
+        if not folded or limit <= 0:
+            return []
+
+        found: dict[int, None] = {}
+        for keys, ids in ((self._names, self._name_ids), (self._words, self._word_ids)):
+            for i in self._prefix_range(keys, folded):
+                found.setdefault(ids[i])
+                if len(found) >= limit:
+                    return [self._cities[i] for i in found]
+        if found:
+            return [self._cities[i] for i in found]
+        return [self._cities[i] for i in self._similar(folded, limit)]
+
+    def _prefix_range(self, keys: list[str], prefix: str) -> Iterator[int]:
+        """Yield positions of the keys starting with prefix."""
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            yield i
+            i += 1
+
+    def _similar(self, folded: str, limit: int) -> list[int]:
+        """Cities ranked by trigram similarity to the query, above the threshold."""
+        query_grams = trigrams(folded)
+        shared: Counter[int] = Counter()
+        for gram in query_grams:
+            shared.update(self._postings.get(gram, ()))
+        scored = []
+        for i, common in shared.items():
+            score = common / (len(query_grams) + self._trigram_counts[i] - common)
+            if score >= SIMILARITY_THRESHOLD:
+                scored.append((-score, self._cities[i].name, i))
+        scored.sort()
+        return [i for _, _, i in scored[:limit]]
@@ -1,10 +1,49 @@
 """Open-Meteo API client for weather data."""
 
-import httpx
+import logging
+import time
+from collections.abc import Callable, Hashable, Iterator, Mapping, Sequence
+from datetime import UTC, date, datetime
+from typing import TYPE_CHECKING, Any, TypeVar
 
 from app.config import Settings
-from app.models import WeatherData
+from app.metrics import ADMISSION_REJECTED, UPSTREAM_ERRORS, UPSTREAM_LATENCY
+from app.models import Forecast, ForecastSeries, WeatherData
+from app.services.admission import ConcurrencyLimiter
+from app.services.cache import TTLCache
+from app.services.http import get_http_client
 from app.services.repository import Repository
+from app.services.resilience import CircuitOpenError, UpstreamPolicy
+
+if TYPE_CHECKING:
+    import httpx
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+FORECAST_HOURLY_VARIABLES = (
+    "temperature_2m",
+    "precipitation",
+    "wind_speed_10m",
+    "weather_code",
+)
+FORECAST_DAILY_VARIABLES = (
+    "weather_code",
+    "temperature_2m_max",
+    "temperature_2m_min",
+    "precipitation_sum",
+)
+FORECAST_MAX_DAYS = 16
+HISTORY_HOURLY_VARIABLES = (
+    "temperature_2m",
+    "wind_speed_10m",
+    "wind_direction_10m",
+    "weather_code",
+)
+
+# observed_at, temperature, windspeed, winddirection, weathercode
+HistoryRow = tuple[datetime, float, float, int, int]
 
 
 class WeatherAPIError(Exception):
@@ -13,17 +52,107 @@ class WeatherAPIError(Exception):
     pass
 
 
+class UpstreamBusyError(WeatherAPIError):
+    """Raised when an API call is shed because too many are already in flight."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class WeatherService:
-    """Service for fetching weather data from Open-Meteo API."""
+    """
+    Service for fetching weather data from Open-Meteo API.
 
-    def __init__(self, settings: Settings, repository: Repository) -> None:
+    With an upstream policy, API calls go through its circuit breaker,
+    retries and hedging. With a limiter, calls beyond its cap are queued
+    briefly and then shed with UpstreamBusyError. When a call fails (or the
+    circuit is open), cached lookups fall back to the last known good value
+    for the location.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        repository: Repository,
+        client: "httpx.Client | None" = None,
+        cache: TTLCache[WeatherData] | None = None,
+        forecast_cache: TTLCache[Forecast] | None = None,
+        upstream: UpstreamPolicy | None = None,
+        limiter: ConcurrencyLimiter | None = None,
+    ) -> None:
+        self.settings = settings
         self.base_url = settings.weather_api_url
-        self.timeout = settings.weather_api_timeout
+        self.cache_precision = settings.weather_cache_precision
         self.repository = repository
+        self.cache = cache
+        self.archive_url = settings.weather_archive_url
+        self.batch_size = settings.weather_api_batch_size
+        self._client = client
+        self.forecast_cache = forecast_cache
+        self.upstream = upstream
+        self.limiter = limiter
+
+    @property
+    def client(self) -> "httpx.Client":
+        """HTTP client for API calls; the process-wide client unless one was given."""
+        if self._client is None:
+            self._client = get_http_client(self.settings)
+        return self._client
+
+    def cache_key(self, latitude: float, longitude: float) -> tuple[float, float]:
+        """Build cache key from coordinates rounded to the cache precision."""
+        return (
+            round(latitude, self.cache_precision),
+            round(longitude, self.cache_precision),
+        )
+
+    def _current_params(self, latitude: str, longitude: str) -> dict[str, str]:
+        """Query parameters for current weather at one or more locations."""
+        return {
+            "latitude": latitude,
+            "longitude": longitude,
+            "current_weather": "true",
+        }
+
+    def _api_error(self, error: Exception, operation: str) -> WeatherAPIError:
+        """Translate an httpx or decoding error into a counted WeatherAPIError."""
+        import httpx
+
+        if isinstance(error, httpx.HTTPStatusError):
+            status = error.response.status_code
+            UPSTREAM_ERRORS.labels(operation, str(status)).inc()
+            return WeatherAPIError(f"API returned error: {status}")
+        if isinstance(error, httpx.RequestError):
+            UPSTREAM_ERRORS.labels(operation, type(error).__name__).inc()
+            return WeatherAPIError(f"API request failed: {error}")
+        UPSTREAM_ERRORS.labels(operation, "invalid_response").inc()
+        return WeatherAPIError(f"Invalid API response: {error}")
+
+    def _parse_current(self, data: Any) -> WeatherData:
+        """Build WeatherData from one location of an API response."""
+        try:
+            current = data.get("current_weather")
+            if not current:
+                raise WeatherAPIError("No current weather data in response")
+
+            weathercode = current["weathercode"]
+
+            return WeatherData(
+                temperature=current["temperature"],
+                windspeed=current["windspeed"],
+                winddirection=current["winddirection"],
+                weathercode=weathercode,
+                time=current["time"],
+                description=self.repository.get_weather_description(weathercode),
+            )
+
+        except (AttributeError, KeyError, ValueError) as e:
+            raise WeatherAPIError(f"Invalid API response: {e}") from e
 
     def get_current_weather(self, latitude: float, longitude: float) -> WeatherData:
         """
-        Fetch current weather for given coordinates.
+        Get current weather for given coordinates, served from cache if fresh.
 
         Args:
             latitude: Location latitude
@@ -32,41 +161,343 @@ class WeatherService:
         Returns:
             WeatherData object with current conditions
 
+        Raises:
+            WeatherAPIError: If the API request fails
+        """
+        if self.cache is None:
+            return self.fetch_current_weather(latitude, longitude)
+
+        return self._load_with_fallback(
+            self.cache,
+            self.cache_key(latitude, longitude),
+            lambda: self.fetch_current_weather(latitude, longitude),
+        )
+
+    def fetch_current_weather(self, latitude: float, longitude: float) -> WeatherData:
+        """
+        Fetch current weather for given coordinates from the API.
+
+        Args:
+            latitude: Location latitude
+            longitude: Location longitude
+
+        Returns:
+            WeatherData object with current conditions
+
+        Raises:
+            WeatherAPIError: If the API request fails
+        """
+        data = self._request_current(str(latitude), str(longitude))
+        if not isinstance(data, dict):
+            raise WeatherAPIError("Invalid API response: expected a single location")
+        return self._parse_current(data)
+
+    def get_current_weather_batch(
+        self, locations: Sequence[tuple[float, float]]
+    ) -> list[WeatherData | WeatherAPIError]:
+        """
+        Get current weather for many coordinates with as few API calls as possible.
+
+        Fresh cache entries are reused; the remaining locations are fetched
+        with one multi-location request per batch of ``weather_api_batch_size``.
+        Locations another request is already fetching are waited for rather
+        than fetched again.
+
+        Args:
+            locations: (latitude, longitude) pairs
+
+        Returns:
+            WeatherData or the WeatherAPIError for each location, in input order
+        """
+        keys, by_key = self._locations_by_key(locations)
+        if self.cache is None:
+            results = self._fetch_many(by_key)
+        else:
+            cache = self.cache
+            results = cache.get_or_load_many(
+                by_key,
+                lambda missing: self._fetch_many({k: by_key[k] for k in missing}),
+            )
+            for key, result in results.items():
+                if isinstance(result, WeatherAPIError):
+                    results[key] = cache.last_known_good(key) or result
+        return [results[k] for k in keys]
+
+    def current_weather_expires_in(
+        self, locations: Sequence[tuple[float, float]]
+    ) -> float:
+        """
+        Seconds until the cached current weather of any location goes stale.
+
+        Zero or less when a location is not cached, or its reading was served
+        stale or as last known good; always zero without a cache.
+        """
+        if self.cache is None:
+            return 0.0
+        return self.cache.expires_in(self.cache_key(lat, lon) for lat, lon in locations)
+
+    def forecast_expires_in(
+        self, latitude: float, longitude: float, days: int
+    ) -> float:
+        """Seconds until the cached forecast goes stale, as for current weather."""
+        if self.forecast_cache is None:
+            return 0.0
+        return self.forecast_cache.expires_in(
+            [(*self.cache_key(latitude, longitude), days)]
+        )
+
+    def refresh_current_weather_batch(
+        self, locations: Sequence[tuple[float, float]]
+    ) -> list[WeatherData | WeatherAPIError]:
+        """
+        Fetch current weather for many coordinates, bypassing cached entries.
+
+        Successful results replace whatever the cache holds for the location.
+
+        Args:
+            locations: (latitude, longitude) pairs
+
+        Returns:
+            WeatherData or the WeatherAPIError for each location, in input order
+        """
+        keys, by_key = self._locations_by_key(locations)
+        results = self._fetch_many(by_key)
+        if self.cache is not None:
+            self.cache.set_many(
+                {k: v for k, v in results.items() if isinstance(v, WeatherData)}
+            )
+        return [results[k] for k in keys]
+
+    def _locations_by_key(
+        self, locations: Sequence[tuple[float, float]]
+    ) -> tuple[
+        list[tuple[float, float]], dict[tuple[float, float], tuple[float, float]]
+    ]:
+        """Cache key of each location, and the first location seen per key."""
+        keys = [self.cache_key(lat, lon) for lat, lon in locations]
+        by_key: dict[tuple[float, float], tuple[float, float]] = {}
+        for key, location in zip(keys, locations, strict=True):
+            by_key.setdefault(key, location)
+        return keys, by_key
+
+    def _fetch_many(
+        self, locations: Mapping[tuple[float, float], tuple[float, float]]
+    ) -> dict[tuple[float, float], WeatherData | WeatherAPIError]:
+        """
+        Fetch locations in batches of ``weather_api_batch_size``.
+
+        Takes and returns results by cache key; each key is fetched at its
+        location's exact coordinates, not the rounded key.
+        """
+        keys = list(locations)
+        results: dict[tuple[float, float], WeatherData | WeatherAPIError] = {}
+        for start in range(0, len(keys), self.batch_size):
+            chunk = keys[start : start + self.batch_size]
+            fetched = self._fetch_batch([locations[k] for k in chunk])
+            results.update((k, fetched[locations[k]]) for k in chunk)
+        return results
+
+    def get_forecast(self, latitude: float, longitude: float, days: int) -> Forecast:
+        """
+        Get hourly and daily forecast for given coordinates.
+
+        Args:
+            latitude: Location latitude
+            longitude: Location longitude
+            days: Number of forecast days (1-16)
+
+        Returns:
+            Forecast with columnar hourly and daily series
+
+        Raises:
+            WeatherAPIError: If the API request fails
+        """
+        if self.forecast_cache is None:
+            return self.fetch_forecast(latitude, longitude, days)
+
+        return self._load_with_fallback(
+            self.forecast_cache,
+            (*self.cache_key(latitude, longitude), days),
+            lambda: self.fetch_forecast(latitude, longitude, days),
+        )
+
+    def fetch_forecast(self, latitude: float, longitude: float, days: int) -> Forecast:
+        """
+        Fetch hourly and daily forecast for given coordinates from the API.
+
         Raises:
             WeatherAPIError: If the API request fails
         """
         url = f"{self.base_url}/forecast"
+        params: dict[str, str | float | int] = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "hourly": ",".join(FORECAST_HOURLY_VARIABLES),
+            "daily": ",".join(FORECAST_DAILY_VARIABLES),
+            "forecast_days": days,
+        }
+
+        data = self._get_json(url, params, operation="forecast")
+
+        try:
+            return Forecast(
+                hourly=ForecastSeries.from_api(
+                    data["hourly"], FORECAST_HOURLY_VARIABLES
+                ),
+                daily=ForecastSeries.from_api(data["daily"], FORECAST_DAILY_VARIABLES),
+            )
+
+        except (KeyError, TypeError, ValueError) as e:
+            raise self._api_error(e, operation="forecast") from e
+
+    def fetch_history(
+        self, latitude: float, longitude: float, start: date, end: date
+    ) -> Iterator[HistoryRow]:
+        """
+        Fetch hourly observations from the archive API (``weather_archive_url``).
+
+        The response is validated up front; rows are then produced lazily so
+        a caller can stream them (e.g. into COPY). Hours with missing values
+        are skipped. Keep ranges to a few months per call: the archive sends
+        the whole range in one response.
+
+        Args:
+            latitude: Location latitude
+            longitude: Location longitude
+            start: First day (inclusive)
+            end: Last day (inclusive)
+
+        Raises:
+            WeatherAPIError: If the API request fails
+        """
+        url = f"{self.archive_url}/archive"
         params: dict[str, str | float] = {
             "latitude": latitude,
             "longitude": longitude,
-            "current_weather": "true",
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "hourly": ",".join(HISTORY_HOURLY_VARIABLES),
+            "timezone": "GMT",
         }
 
+        data = self._get_json(url, params, operation="archive")
+
         try:
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
+            hourly = data["hourly"]
+            times = hourly["time"]
+            columns = [hourly[name] for name in HISTORY_HOURLY_VARIABLES]
+            for name, column in zip(HISTORY_HOURLY_VARIABLES, columns, strict=True):
+                if len(column) != len(times):
+                    raise ValueError(
+                        f"{name} has {len(column)} values, expected {len(times)}"
+                    )
+        except (KeyError, TypeError, ValueError) as e:
+            raise self._api_error(e, operation="archive") from e
 
-            current = data.get("current_weather")
-            if not current:
-                raise WeatherAPIError("No current weather data in response")
+        return self._history_rows(times, *columns)
 
-            weathercode = current["weathercode"]
+    @staticmethod
+    def _history_rows(
+        times: Sequence[str],
+        temperatures: Sequence[float | None],
+        windspeeds: Sequence[float | None],
+        winddirections: Sequence[float | None],
+        weathercodes: Sequence[float | None],
+    ) -> Iterator[HistoryRow]:
+        """Zip the archive's hourly arrays into rows, skipping incomplete hours."""
+        for observed, temperature, windspeed, winddirection, weathercode in zip(
+            times, temperatures, windspeeds, winddirections, weathercodes, strict=True
+        ):
+            if (
+                temperature is None
+                or windspeed is None
+                or winddirection is None
+                or weathercode is None
+            ):
+                continue
+            yield (
+                datetime.fromisoformat(observed).replace(tzinfo=UTC),
+                temperature,
+                windspeed,
+                int(winddirection),
+                int(weathercode),
+            )
 
-            return WeatherData(
-                temperature=current["temperature"],
-                windspeed=current["windspeed"],
-                winddirection=current["winddirection"],
-                weathercode=weathercode,
-                time=current["time"],
-                description=self.repository.get_weather_description(weathercode),
+    def _load_with_fallback(
+        self, cache: TTLCache[T], key: Hashable, loader: Callable[[], T]
+    ) -> T:
+        """Load through the cache, serving the last known good value on failure."""
+        try:
+            return cache.get_or_load(key, loader)
+        except WeatherAPIError as e:
+            fallback = cache.last_known_good(key)
+            if fallback is None:
+                raise
+            logger.warning("Serving last known good %s for %r: %s", cache.name, key, e)
+            return fallback
+
+    def _fetch_batch(
+        self, locations: list[tuple[float, float]]
+    ) -> dict[tuple[float, float], WeatherData | WeatherAPIError]:
+        """Fetch one multi-location request, reporting failures per location."""
+        try:
+            data = self._request_current(
+                ",".join(str(lat) for lat, _ in locations),
+                ",".join(str(lon) for _, lon in locations),
             )
+        except WeatherAPIError as e:
+            return dict.fromkeys(locations, e)
 
-        except httpx.HTTPStatusError as e:
-            msg = f"API returned error: {e.response.status_code}"
-            raise WeatherAPIError(msg) from e
-        except httpx.RequestError as e:
-            raise WeatherAPIError(f"API request failed: {e}") from e
-        except (KeyError, ValueError) as e:
-            raise WeatherAPIError(f"Invalid API response: {e}") from e
+        items = data if isinstance(data, list) else [data]
+        if len(items) != len(locations):
+            error = WeatherAPIError(
+                f"Invalid API response: expected {len(locations)} locations, "
+                f"got {len(items)}"
+            )
+            return dict.fromkeys(locations, error)
+
+        results: dict[tuple[float, float], WeatherData | WeatherAPIError] = {}
+        for location, item in zip(locations, items, strict=True):
+            try:
+                results[location] = self._parse_current(item)
+            except WeatherAPIError as e:
+                results[location] = e
+        return results
+
+    def _request_current(self, latitude: str, longitude: str) -> Any:
+        """Request current weather; coordinates may be comma-separated lists."""
+        url = f"{self.base_url}/forecast"
+        params = self._current_params(latitude, longitude)
+        return self._get_json(url, params, operation="current")
+
+    def _get_json(self, url: str, params: Mapping[str, Any], operation: str) -> Any:
+        """GET a JSON document, recording upstream latency and errors."""
+        import httpx
+
+        def request() -> Any:
+            response = self.client.get(url, params=params)
+            response.raise_for_status()
+            return response.json()
+
+        if self.limiter is not None and not self.limiter.acquire():
+            ADMISSION_REJECTED.labels("overloaded").inc()
+            raise UpstreamBusyError(
+                "Too many requests waiting on the weather API",
+                retry_after=self.limiter.queue_timeout,
+            )
+
+        start = time.perf_counter()
+        try:
+            if self.upstream is None:
+                return request()
+            return self.upstream.call(request, limiter=self.limiter)
+
+        except CircuitOpenError as e:
+            UPSTREAM_ERRORS.labels(operation, "circuit_open").inc()
+            raise WeatherAPIError(f"API unavailable: {e}") from e
+        except (httpx.HTTPError, ValueError) as e:
+            raise self._api_error(e, operation) from e
+        finally:
+            UPSTREAM_LATENCY.labels(operation).observe(time.perf_counter() - start)
+            if self.limiter is not None:
+                self.limiter.release()
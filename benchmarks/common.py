@@ -0,0 +1,66 @@
+"""Shared helpers for benchmark scripts."""
+
+import json
+import statistics
+import subprocess
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Summarize latency samples (seconds) as milliseconds."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    if len(ordered) > 1:
+        cuts = statistics.quantiles(ordered, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = ordered[0]
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def git_revision() -> str:
+    """Short hash of the current commit, or 'unknown' outside a checkout."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return result.stdout.strip()
+
+
+def save_results(name: str, results: dict[str, Any]) -> Path:
+    """Write results to benchmarks/results/<name>-<revision>.json."""
+    revision = git_revision()
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path = RESULTS_DIR / f"{name}-{revision}.json"
+    payload = {
+        "benchmark": name,
+        "revision": revision,
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "results": results,
+    }
+    path.write_text(json.dumps(payload, indent=2) + "\n")
+    return path
+
+
+def print_table(rows: dict[str, dict[str, Any]]) -> None:
+    """Print one line per benchmark with its latency summary."""
+    for name, stats in rows.items():
+        details = "  ".join(f"{k}={v}" for k, v in stats.items())
+        print(f"{name:<32} {details}")
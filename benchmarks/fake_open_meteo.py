@@ -0,0 +1,165 @@
+"""Local stand-in for the Open-Meteo forecast API.
+
+Serves ``/v1/forecast`` with deterministic data for current weather,
+multi-location requests and hourly/daily forecasts, and ``/v1/archive`` with
+hourly history, with configurable latency and error rate. Point the app at
+it with ``WEATHER_API_URL=http://127.0.0.1:8001/v1`` (and the same for
+``WEATHER_ARCHIVE_URL``).
+
+Usage:
+    uv run python -m benchmarks.fake_open_meteo --port 8001 --latency-ms 80
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeOpenMeteoServer(ThreadingHTTPServer):
+    """Threaded HTTP server with latency and error injection settings."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+    ) -> None:
+        super().__init__(("127.0.0.1", port), FakeOpenMeteoHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as ``weather_api_url``."""
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def count_request(self) -> None:
+        with self._count_lock:
+            self.request_count += 1
+
+
+class FakeOpenMeteoHandler(BaseHTTPRequestHandler):
+    """Request handler producing Open-Meteo shaped responses."""
+
+    server: FakeOpenMeteoServer
+
+    def do_GET(self) -> None:
+        self.server.count_request()
+        delay = self.server.latency_ms + random.uniform(0, self.server.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+
+        url = urlparse(self.path)
+        if url.path not in ("/v1/forecast", "/v1/archive"):
+            self._send(404, {"error": True, "reason": "Not found"})
+            return
+        if random.random() < self.server.error_rate:
+            self._send(503, {"error": True, "reason": "Injected failure"})
+            return
+
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        latitudes = params.get("latitude", "0").split(",")
+        longitudes = params.get("longitude", "0").split(",")
+        locations = [
+            self._location(float(lat), float(lon), params)
+            for lat, lon in zip(latitudes, longitudes, strict=False)
+        ]
+        self._send(200, locations[0] if len(locations) == 1 else locations)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Silence per-request logging."""
+
+    def _location(self, lat: float, lon: float, params: dict[str, str]) -> Any:
+        data: dict[str, Any] = {"latitude": lat, "longitude": lon}
+        if params.get("current_weather") == "true":
+            data["current_weather"] = {
+                "temperature": round(10 + lat % 5, 1),
+                "windspeed": round(5 + lon % 10, 1),
+                "winddirection": int(lat * lon) % 360,
+                "weathercode": 3,
+                "time": time.strftime("%Y-%m-%dT%H:00", time.gmtime()),
+            }
+        if "start_date" in params:
+            start = date.fromisoformat(params["start_date"])
+            days = (date.fromisoformat(params["end_date"]) - start).days + 1
+            first = datetime(start.year, start.month, start.day)
+            times = [
+                (first + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M")
+                for i in range(days * 24)
+            ]
+        else:
+            days = int(params.get("forecast_days", 7))
+            times = [f"t{i}" for i in range(days * 24)]
+        if "hourly" in params:
+            hours = days * 24
+            data["hourly"] = {
+                "time": times,
+                **{
+                    name: [float(i % 24) for i in range(hours)]
+                    for name in params["hourly"].split(",")
+                },
+            }
+        if "daily" in params:
+            data["daily"] = {
+                "time": [f"d{i}" for i in range(days)],
+                **{
+                    name: [float(i) for i in range(days)]
+                    for name in params["daily"].split(",")
+                },
+            }
+        return data
+
+    def _send(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server(
+    port: int = 0,
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    error_rate: float = 0.0,
+) -> FakeOpenMeteoServer:
+    """Start the fake server in a daemon thread and return it."""
+    server = FakeOpenMeteoServer(port, latency_ms, jitter_ms, error_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    """Run the fake Open-Meteo server in the foreground."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeOpenMeteoServer(
+        args.port, args.latency_ms, args.jitter_ms, args.error_rate
+    )
+    print(f"Fake Open-Meteo listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""End-to-end load driver for a running app.
+
+Start the fake upstream and the app pointed at it, with the per-client rate
+limit off (every driver thread shares one address), then run the driver:
+
+    uv run python -m benchmarks.fake_open_meteo --latency-ms 80 &
+    WEATHER_API_URL=http://127.0.0.1:8001/v1 RATE_LIMIT_PER_MINUTE=0 \
+        uv run gunicorn 'app:create_app()'
+    uv run python -m benchmarks.load --url http://127.0.0.1:8000 --duration 30
+
+Reports requests per second and p50/p95/p99 latency per endpoint.
+"""
+
+import argparse
+import itertools
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Any
+
+import httpx
+
+from benchmarks.common import print_table, save_results, summarize
+
+CSRF_PATTERN = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+
+ENDPOINTS = ("index", "cities", "weather")
+
+
+class LoadWorker(threading.Thread):
+    """Thread issuing requests in a closed loop until the deadline."""
+
+    def __init__(
+        self, url: str, endpoints: list[str], cities: list[str], deadline: float
+    ) -> None:
+        super().__init__(daemon=True)
+        self.url = url
+        self.endpoints = endpoints
+        self.cities = itertools.cycle(cities)
+        self.deadline = deadline
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    def run(self) -> None:
+        with httpx.Client(base_url=self.url, timeout=30) as client:
+            csrf_token = self._csrf_token(client)
+            for endpoint in itertools.cycle(self.endpoints):
+                if time.perf_counter() >= self.deadline:
+                    return
+                start = time.perf_counter()
+                try:
+                    response = self._request(client, endpoint, csrf_token)
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                self.samples[endpoint].append(time.perf_counter() - start)
+                if not ok:
+                    self.errors[endpoint] += 1
+
+    def _request(
+        self, client: httpx.Client, endpoint: str, csrf_token: str
+    ) -> httpx.Response:
+        if endpoint == "index":
+            return client.get("/")
+        if endpoint == "cities":
+            return client.get("/api/cities")
+        return client.post(
+            "/weather", data={"csrf_token": csrf_token, "city": next(self.cities)}
+        )
+
+    def _csrf_token(self, client: httpx.Client) -> str:
+        match = CSRF_PATTERN.search(client.get("/").text)
+        if match is None:
+            raise RuntimeError("CSRF token not found on index page")
+        return match.group(1)
+
+
+def main() -> None:
+    """Run the load test and save results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument(
+        "--endpoints",
+        default=",".join(ENDPOINTS),
+        help=f"Comma-separated subset of: {', '.join(ENDPOINTS)}",
+    )
+    args = parser.parse_args()
+
+    endpoints = args.endpoints.split(",")
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    cities = [c["name"] for c in httpx.get(f"{args.url}/api/cities").json()["cities"]]
+    deadline = time.perf_counter() + args.duration
+    workers = [
+        LoadWorker(args.url, endpoints, cities, deadline)
+        for _ in range(args.concurrency)
+    ]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    results: dict[str, dict[str, Any]] = {}
+    for endpoint in endpoints:
+        samples = [s for w in workers for s in w.samples[endpoint]]
+        errors = sum(w.errors[endpoint] for w in workers)
+        results[endpoint] = {
+            **summarize(samples),
+            "errors": errors,
+            "rps": round(len(samples) / elapsed, 1),
+        }
+
+    print_table(results)
+    path = save_results(
+        "load",
+        {
+            "url": args.url,
+            "concurrency": args.concurrency,
+            "duration_s": round(elapsed, 2),
+            "endpoints": results,
+        },
+    )
+    print(f"Saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
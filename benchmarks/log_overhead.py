@@ -0,0 +1,134 @@
+"""Per-request cost of the request logger with each logging setup.
+
+Times what the logging middleware does on the request thread once a
+response is ready (the sampling decision and ``logger.info`` with the
+request fields) for each setup:
+
+    off            INFO disabled, no record is created
+    sync.text      formatted and written on the request thread (the old setup)
+    sync.json      the same with the JSON formatter
+    queue.json     handed to the background writer thread
+    queue.sampled  the same, logging 10% of successful requests
+
+Records go to a temporary file, flushed per record like stderr. Pass
+``--write-delay`` to make each write take that many microseconds longer, as
+when stderr is a pipe the log collector drains slowly:
+
+    uv run python -m benchmarks.log_overhead --iterations 20000 --write-delay 200
+"""
+
+import argparse
+import logging
+import queue
+import tempfile
+import time
+from logging.handlers import QueueListener
+from typing import IO, Any
+
+from app.log import BackgroundQueueHandler, JsonFormatter, TextFormatter
+from app.middleware.logging import RequestSampler
+from benchmarks.common import print_table, save_results
+from benchmarks.micro import measure
+
+logger = logging.getLogger("app.middleware.logging")
+
+
+class SlowStream(logging.StreamHandler):  # type: ignore[type-arg]
+    """Stream handler whose writes take an extra fixed delay."""
+
+    def __init__(self, stream: IO[str], delay: float) -> None:
+        super().__init__(stream)
+        self.delay = delay
+
+    def flush(self) -> None:
+        super().flush()
+        if self.delay:
+            time.sleep(self.delay)
+
+
+def log_request(sampler: RequestSampler) -> None:
+    """Log one completed request the way the logging middleware does."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    rate = sampler.sample_rate(200, 1.5)
+    if rate is None:
+        return
+    logger.info(
+        "Request completed",
+        extra={
+            "request_id": "0123abcd",
+            "method": "GET",
+            "path": "/api/weather",
+            "status": 200,
+            "duration_ms": 1.5,
+            "sample_rate": rate,
+        },
+    )
+
+
+def run(
+    handler: logging.Handler, level: int, sampler: RequestSampler, iterations: int
+) -> dict[str, Any]:
+    """Time log_request with only handler installed on the root logger."""
+    root = logging.getLogger()
+    saved = root.handlers[:], root.level
+    root.handlers = [handler]
+    root.setLevel(level)
+    try:
+        return measure(lambda: log_request(sampler), iterations)
+    finally:
+        root.handlers, root.level = saved
+
+
+def main() -> None:
+    """Run the logging overhead benchmark and save results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=10000)
+    parser.add_argument(
+        "--write-delay", type=float, default=0.0, help="Extra microseconds per write"
+    )
+    args = parser.parse_args()
+    n = args.iterations
+    delay = args.write_delay / 1e6
+
+    everything = RequestSampler(rate=1.0, threshold=0)
+    sampled = RequestSampler(rate=0.1, threshold=0)
+
+    with tempfile.TemporaryFile("w") as output:
+
+        def stream(formatter: logging.Formatter) -> logging.Handler:
+            handler = SlowStream(output, delay)
+            handler.setFormatter(formatter)
+            return handler
+
+        handler = BackgroundQueueHandler(queue.Queue(10_000))
+        listener = QueueListener(handler.queue, stream(JsonFormatter()))
+        listener.start()
+        try:
+            results: dict[str, dict[str, Any]] = {
+                "off": run(stream(TextFormatter()), logging.WARNING, everything, n),
+                "sync.text": run(stream(TextFormatter()), logging.INFO, everything, n),
+                "sync.json": run(stream(JsonFormatter()), logging.INFO, everything, n),
+                "queue.json": run(handler, logging.INFO, everything, n),
+                "queue.sampled": run(handler, logging.INFO, sampled, n),
+            }
+        finally:
+            listener.stop()
+
+    print_table(results)
+    if handler.dropped:
+        print(f"{handler.dropped} records dropped by the full queue")
+    path = save_results(
+        "log_overhead",
+        {
+            "iterations": n,
+            "write_delay_us": args.write_delay,
+            "dropped": handler.dropped,
+            **results,
+        },
+    )
+    print(f"Saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
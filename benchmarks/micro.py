@@ -0,0 +1,159 @@
+"""Micro-benchmarks for hot paths.
+
+Runs against the local fake Open-Meteo server and an in-memory reference
+data snapshot built from the seed data, so no network or database is needed.
+Pass ``--with-db`` to also time Repository queries against PostgreSQL.
+
+Usage:
+    uv run python -m benchmarks.micro --iterations 2000
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+from flask import g, render_template
+from sqlmodel import Session
+
+from app import create_app
+from app.config import Settings
+from app.database import get_engine
+from app.forms import CityForm
+from app.models import City, WeatherCode, WeatherData
+from app.services import (
+    ReferenceData,
+    ReferenceDataStore,
+    Repository,
+    TTLCache,
+    WeatherService,
+)
+from benchmarks.common import print_table, save_results, summarize
+from benchmarks.fake_open_meteo import start_server
+from scripts.seed import CITIES_DATA, WEATHER_CODES_DATA, city_row, weather_code_row
+
+
+def measure(func: Callable[[], Any], iterations: int) -> dict[str, float]:
+    """Call func repeatedly and summarize per-call latency."""
+    func()  # warm up
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    elapsed = time.perf_counter() - started
+    return {**summarize(samples), "ops_per_s": round(iterations / elapsed, 1)}
+
+
+def no_database() -> Session:
+    """Session factory for stores that must never query the database."""
+    raise RuntimeError("The benchmark reference store has no database")
+
+
+def reference_store() -> ReferenceDataStore:
+    """Reference store preloaded with the seed data instead of the database."""
+    cities = [
+        City(id=i, name=name, latitude=latitude, longitude=longitude)
+        for i, (name, latitude, longitude) in enumerate(map(city_row, CITIES_DATA), 1)
+    ]
+    weather_codes = [
+        WeatherCode(code=code, description=description)
+        for code, description in map(weather_code_row, WEATHER_CODES_DATA)
+    ]
+    store = ReferenceDataStore(
+        session_factory=no_database,
+        refresh_interval=float("inf"),
+    )
+    store.preload(
+        ReferenceData.build(
+            version="benchmark", cities=cities, weather_codes=weather_codes
+        )
+    )
+    return store
+
+
+def main() -> None:
+    """Run micro-benchmarks and save results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--with-db", action="store_true")
+    args = parser.parse_args()
+
+    server = start_server()
+    settings = Settings(weather_api_url=server.url, weather_refresh_interval=0)
+    repository = Repository(reference=reference_store())
+    client = httpx.Client()
+    city = repository.get_city_by_name("Praha")
+    assert city is not None
+    cities = repository.get_all_cities()
+
+    uncached = WeatherService(settings, repository, client)
+    cached = WeatherService(
+        settings, repository, client, TTLCache("benchmark", ttl=3600, max_size=1024)
+    )
+    n = args.iterations
+    results: dict[str, dict[str, Any]] = {
+        "weather.current.uncached": measure(
+            lambda: uncached.get_current_weather(city.latitude, city.longitude), n
+        ),
+        "weather.current.cached": measure(
+            lambda: cached.get_current_weather(city.latitude, city.longitude), n
+        ),
+        "weather.batch.uncached": measure(
+            lambda: uncached.get_current_weather_batch(
+                [(c.latitude, c.longitude) for c in cities]
+            ),
+            n,
+        ),
+        "repository.city_by_name.snapshot": measure(
+            lambda: repository.get_city_by_name("Praha"), n
+        ),
+        "repository.all_cities.snapshot": measure(repository.get_all_cities, n),
+        "repository.nearest_city.snapshot": measure(
+            lambda: repository.get_nearest_city(49.8, 15.5), n
+        ),
+        "repository.search_cities.snapshot": measure(
+            lambda: repository.search_cities("ceske bud"), n
+        ),
+    }
+
+    if args.with_db:
+        session = Session(get_engine(settings))
+        db_repository = Repository(session)
+        results["repository.city_by_name.db"] = measure(
+            lambda: db_repository.get_city_by_name("Praha"), n
+        )
+        results["repository.all_cities.db"] = measure(db_repository.get_all_cities, n)
+        session.close()
+
+    app = create_app(settings)
+    weather = WeatherData(
+        temperature=12.5,
+        windspeed=8.0,
+        winddirection=225,
+        weathercode=3,
+        time="2025-01-17T12:00",
+        description="Overcast",
+    )
+
+    def render_index() -> str:
+        form = CityForm()
+        return render_template(
+            "index.html", form=form, weather=weather, selected_city=city
+        )
+
+    with app.test_request_context("/"):
+        g.repository = repository
+        results["template.index"] = measure(render_index, n)
+
+    client.close()
+    server.shutdown()
+
+    print_table(results)
+    print(f"Saved to {save_results('micro', results)}")
+
+
+if __name__ == "__main__":
+    main()
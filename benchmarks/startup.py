@@ -0,0 +1,135 @@
+"""Cold-start benchmark: time from launching gunicorn to the first ready response.
+
+Each run starts a fresh gunicorn with the repository's gunicorn.conf.py and
+polls ``/health`` and ``/ready`` until they answer 200, then stops it. The
+import and ``create_app`` time of a bare interpreter is measured separately.
+``/ready`` needs the database, configured through the ``PG*`` variables as in
+production:
+
+    uv run python -m benchmarks.startup --runs 5 --workers 2
+
+Reports p50/p95 milliseconds to live and to ready across runs.
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Any
+
+import httpx
+
+from benchmarks.common import print_table, save_results, summarize
+
+# Times the app import and factory in a fresh interpreter
+IMPORT_PROBE = """
+import time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+print(imported - start, time.perf_counter() - imported)
+"""
+
+
+def measure_import() -> tuple[float, float]:
+    """Return (import seconds, create_app seconds) in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported, created = result.stdout.split()
+    return float(imported), float(created)
+
+
+def wait_for(url: str, deadline: float) -> float | None:
+    """Poll url until it returns 200; return the time it did, or None."""
+    while time.perf_counter() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return time.perf_counter()
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def measure_start(port: int, workers: int, timeout: float) -> dict[str, float | None]:
+    """Start gunicorn once and return seconds until /health and /ready succeed."""
+    url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(workers),
+            "app:create_app()",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env={**os.environ, "WEATHER_REFRESH_INTERVAL": "0"},
+    )
+    try:
+        deadline = started + timeout
+        live = wait_for(f"{url}/health", deadline)
+        ready = wait_for(f"{url}/ready", deadline) if live is not None else None
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+    return {
+        "live": None if live is None else live - started,
+        "ready": None if ready is None else ready - started,
+    }
+
+
+def main() -> None:
+    """Run the startup benchmark and save results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    samples: dict[str, list[float]] = {
+        "import": [],
+        "create_app": [],
+        "gunicorn.live": [],
+        "gunicorn.ready": [],
+    }
+    failures = 0
+    for _ in range(args.runs):
+        imported, created = measure_import()
+        samples["import"].append(imported)
+        samples["create_app"].append(created)
+        times = measure_start(args.port, args.workers, args.timeout)
+        if times["live"] is not None:
+            samples["gunicorn.live"].append(times["live"])
+        if times["ready"] is None:
+            failures += 1
+        else:
+            samples["gunicorn.ready"].append(times["ready"])
+
+    results: dict[str, dict[str, Any]] = {
+        name: summarize(values) for name, values in samples.items()
+    }
+    print_table(results)
+    if failures:
+        print(f"/ready did not succeed within {args.timeout}s in {failures} run(s)")
+    path = save_results(
+        "startup",
+        {"runs": args.runs, "workers": args.workers, "failures": failures, **results},
+    )
+    print(f"Saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
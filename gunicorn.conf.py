@@ -0,0 +1,42 @@
+"""Gunicorn configuration (loaded automatically from the working directory)."""
+
+import os
+import shutil
+from typing import Any
+
+# Threaded workers, so each long-lived /api/weather/stream connection holds a
+# thread rather than a whole worker process. Keep WEATHER_STREAM_MAX_CLIENTS,
+# and ADMISSION_MAX_IN_FLIGHT plus ADMISSION_MAX_QUEUE, below the thread count
+# to leave threads for regular requests.
+worker_class = "gthread"
+threads = 64
+
+# Import and build the app once in the master; workers are forked from it, so
+# scaling up only costs a fork. The database engine, HTTP client and
+# background threads are created per worker after the fork.
+preload_app = True
+
+# Reset the Prometheus multiprocess directory while the config is loaded. With
+# preload_app the master imports the app, which creates metric files in this
+# directory, before any server hook (such as on_starting) runs.
+if multiproc_dir := os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def post_worker_init(worker: Any) -> None:
+    """Start the app's background threads in the freshly forked worker."""
+    from flask import Flask
+
+    from app.middleware import start_background_services
+
+    if isinstance(worker.wsgi, Flask):
+        start_background_services(worker.wsgi)
+
+
+def child_exit(server: Any, worker: Any) -> None:
+    """Drop live gauges of exited workers from the aggregated metrics."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)  # type: ignore[no-untyped-call]
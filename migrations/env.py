@@ -6,7 +6,11 @@ from alembic import context
 from sqlmodel import SQLModel
 
 from app.config import get_settings
-from app.models import City, WeatherCode  # noqa: F401 - Import to register models
+from app.models import (  # noqa: F401 - Import to register models
+    City,
+    WeatherCode,
+    WeatherObservation,
+)
 
 config = context.config
 settings = get_settings()
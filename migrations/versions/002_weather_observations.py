@@ -0,0 +1,46 @@
+"""Add weather_observations table.
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "002"
+down_revision: str | None = "001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "weather_observations",
+        sa.Column("city_id", sa.Integer(), nullable=False),
+        sa.Column("observed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("temperature", sa.Float(), nullable=False),
+        sa.Column("windspeed", sa.Float(), nullable=False),
+        sa.Column("winddirection", sa.Integer(), nullable=False),
+        sa.Column("weathercode", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["city_id"], ["cities.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("city_id", "observed_at"),
+    )
+    # Rows arrive roughly in time order, so a BRIN index stays tiny while
+    # still pruning time-range scans across all cities.
+    op.create_index(
+        "ix_weather_observations_observed_at",
+        "weather_observations",
+        ["observed_at"],
+        postgresql_using="brin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_weather_observations_observed_at", table_name="weather_observations"
+    )
+    op.drop_table("weather_observations")
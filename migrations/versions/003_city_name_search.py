@@ -0,0 +1,40 @@
+"""Add diacritic-insensitive trigram index for city name search.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "003"
+down_revision: str | None = "002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # unaccent() is only STABLE (its dictionary could change), so it cannot be
+    # used in an index; this wrapper pins the dictionary and is IMMUTABLE.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        RETURN public.unaccent('public.unaccent'::regdictionary, $1)
+        """
+    )
+    # Serves prefix (LIKE 'q%'), word (LIKE '% q%') and similarity (%) matches
+    op.execute(
+        "CREATE INDEX ix_cities_name_search ON cities "
+        "USING gin (f_unaccent(lower(name)) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_cities_name_search")
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
@@ -0,0 +1,204 @@
+"""Backfill hourly weather history from the Open-Meteo archive API.
+
+The date range is split into chunks per city, fetched concurrently by a
+bounded pool of workers and streamed into ``weather_observations`` with
+COPY, one transaction per chunk. Finished chunks are appended to a
+checkpoint file, so an interrupted or partially failed run picks up where
+it stopped when started again with the same arguments:
+
+    uv run python -m scripts.backfill --start 2020-01-01 --end 2024-12-31
+
+Re-running a chunk is harmless: rows are upserted by (city, hour).
+"""
+
+import argparse
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlmodel import Session
+
+from app.config import Settings, get_settings
+from app.database import get_engine
+from app.models import City
+from app.services import Repository, WeatherService, create_upstream_policy
+
+Chunk = tuple[int, date, date]
+
+
+def city_id(city: City) -> int:
+    """Primary key of a city loaded from the database."""
+    if city.id is None:
+        raise ValueError(f"City {city.name} has no id")
+    return city.id
+
+
+def split_range(start: date, end: date, days: int) -> Iterator[tuple[date, date]]:
+    """Split an inclusive date range into consecutive ranges of up to days."""
+    while start <= end:
+        chunk_end = min(start + timedelta(days=days - 1), end)
+        yield start, chunk_end
+        start = chunk_end + timedelta(days=1)
+
+
+class Checkpoint:
+    """Append-only record of finished chunks, one ``city_id start end`` per line."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.done: set[Chunk] = set()
+        if path.exists():
+            for line in path.read_text().splitlines():
+                key, start, end = line.split()
+                self.done.add(
+                    (int(key), date.fromisoformat(start), date.fromisoformat(end))
+                )
+        self._file = path.open("a")
+
+    def mark(self, chunk: Chunk) -> None:
+        """Record a chunk as done; flushed so a crash loses at most this one."""
+        key, start, end = chunk
+        self._file.write(f"{key} {start.isoformat()} {end.isoformat()}\n")
+        self._file.flush()
+        self.done.add(chunk)
+
+    def close(self) -> None:
+        """Close the checkpoint file."""
+        self._file.close()
+
+
+class Backfill:
+    """Fetches and stores chunks; safe to call from several worker threads."""
+
+    def __init__(self, settings: Settings, service: WeatherService) -> None:
+        self.settings = settings
+        self.service = service
+        self.rows = 0
+        self._lock = threading.Lock()
+
+    def run_chunk(self, city: City, start: date, end: date) -> int:
+        """Fetch one chunk and COPY it into the database in its own transaction."""
+        history = self.service.fetch_history(city.latitude, city.longitude, start, end)
+        key = city_id(city)
+        with Session(get_engine(self.settings)) as session:
+            count = Repository(session).copy_observations(
+                (key, *row) for row in history
+            )
+            session.commit()
+        with self._lock:
+            self.rows += count
+        return count
+
+
+def main() -> None:
+    """Run the backfill."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--start", type=date.fromisoformat, required=True)
+    parser.add_argument(
+        "--end",
+        type=date.fromisoformat,
+        default=date.today() - timedelta(days=6),
+        help="Last day (default: 6 days ago, the archive's typical delay)",
+    )
+    parser.add_argument("--cities", help="Comma-separated city names (default: all)")
+    parser.add_argument("--chunk-days", type=int, default=92)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--checkpoint", type=Path, default=Path(".backfill-progress"))
+    args = parser.parse_args()
+    if args.start > args.end:
+        parser.error("--start must not be after --end")
+    if args.chunk_days < 1:
+        parser.error("--chunk-days must be at least 1")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    settings = get_settings()
+    if args.workers > settings.db_pool_size + settings.db_max_overflow:
+        parser.error("--workers exceeds the database pool (DB_POOL_SIZE + overflow)")
+
+    with Session(get_engine(settings)) as session:
+        repository = Repository(session)
+        if args.cities:
+            names = [n.strip() for n in args.cities.split(",") if n.strip()]
+            found = repository.get_cities_by_names(names)
+            missing = [n for n in names if n not in found]
+            if missing:
+                parser.error(f"unknown cities: {', '.join(missing)}")
+            cities = [found[n] for n in names]
+        else:
+            cities = repository.get_all_cities()
+
+    checkpoint = Checkpoint(args.checkpoint)
+    chunks = [
+        (city, start, end)
+        for start, end in split_range(args.start, args.end, args.chunk_days)
+        for city in cities
+        if city.id is not None and (city.id, start, end) not in checkpoint.done
+    ]
+    total = len(chunks)
+    print(f"{total} chunks to fetch ({len(checkpoint.done)} already done)")
+
+    # Retries and the circuit breaker apply to archive calls as well. Hedging
+    # and the slow-call check do not: a slow archive chunk is large, not
+    # stuck, so a duplicate request would only double the load on the archive
+    # and counting it as a failure would open the circuit on healthy calls.
+    upstream = create_upstream_policy(
+        settings.model_copy(
+            update={"weather_api_hedge": False, "weather_api_slow_call": 0.0}
+        )
+    )
+    service = WeatherService(settings, Repository(), upstream=upstream)
+    backfill = Backfill(settings, service)
+    completed = failures = 0
+    started = time.perf_counter()
+    pending: dict[Future[int], tuple[City, date, date]] = {}
+    queue = iter(chunks)
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        while True:
+            # Submit lazily, keeping at most two chunks per worker queued, so
+            # an interrupted run has little work in flight
+            while len(pending) < args.workers * 2:
+                chunk = next(queue, None)
+                if chunk is None:
+                    break
+                pending[pool.submit(backfill.run_chunk, *chunk)] = chunk
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                city, start, end = pending.pop(future)
+                completed += 1
+                try:
+                    future.result()
+                except Exception as e:
+                    failures += 1
+                    print(f"\n{city.name} {start}..{end} failed: {e}", file=sys.stderr)
+                else:
+                    checkpoint.mark((city_id(city), start, end))
+            elapsed = time.perf_counter() - started
+            print(
+                f"\r{completed}/{total} chunks, {backfill.rows} rows, "
+                f"{backfill.rows / elapsed:,.0f} rows/s",
+                end="",
+                flush=True,
+            )
+    checkpoint.close()
+    upstream.shutdown()
+
+    elapsed = time.perf_counter() - started
+    rate = backfill.rows / elapsed if elapsed else 0.0
+    print(
+        f"\n{backfill.rows} rows from {total - failures} chunks in {elapsed:.1f}s "
+        f"({rate:,.0f} rows/s)"
+    )
+    if failures:
+        print(f"{failures} chunks failed; run again to retry them", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
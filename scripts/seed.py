@@ -1,10 +1,32 @@
-"""Seed database with initial data."""
+"""Seed or sync the reference data (cities and weather codes).
 
-from sqlmodel import Session, delete
+Without arguments the built-in cities and weather codes are loaded. Larger
+data sets are read from CSV (with a header row), JSON (an array of objects)
+or JSON Lines files, with the columns of the target table:
+
+    uv run python -m scripts.seed --cities obce.csv --weather-codes codes.json
+
+Tables are synced in one transaction: new rows are inserted and changed rows
+updated. Rows missing from the input are kept unless --prune is given, so
+seeding the built-in cities (as compose does on every start) never removes
+cities loaded from a file. The app never sees an empty or half-loaded table.
+"""
+
+import argparse
+import csv
+import json
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import Any, TypeVar
+
+from sqlmodel import Session
 
 from app.config import get_settings
 from app.database import get_engine
-from app.models import City, WeatherCode
+from app.services import Repository, SyncResult
+from app.services.repository import CityRow, WeatherCodeRow
+
+T = TypeVar("T")
 
 CITIES_DATA = [
     {"name": "Praha", "latitude": 50.0755, "longitude": 14.4378},
@@ -46,27 +68,98 @@ WEATHER_CODES_DATA = [
 ]
 
 
-def main() -> None:
-    """Run database seeding."""
-    settings = get_settings()
-    engine = get_engine(settings)
+def read_records(path: Path) -> Iterator[dict[str, Any]]:
+    """Stream records from a CSV, JSON Lines or JSON file."""
+    with path.open(encoding="utf-8", newline="") as f:
+        if path.suffix == ".csv":
+            yield from csv.DictReader(f)
+        elif path.suffix in (".jsonl", ".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif path.suffix == ".json":
+            yield from json.load(f)
+        else:
+            raise ValueError(f"{path}: expected a .csv, .json or .jsonl file")
+
 
-    with Session(engine) as session:
-        # Clear existing data
-        session.exec(delete(City))
-        session.exec(delete(WeatherCode))
+def convert(
+    records: Iterable[dict[str, Any]],
+    to_row: Callable[[dict[str, Any]], T],
+    source: str,
+) -> Iterator[T]:
+    """Convert records to table rows, naming the record that fails."""
+    for number, record in enumerate(records, 1):
+        try:
+            yield to_row(record)
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"{source}: record {number}: {e!r}") from e
 
-        # Insert fresh data
-        for data in CITIES_DATA:
-            session.add(City(**data))
 
-        for data in WEATHER_CODES_DATA:
-            session.add(WeatherCode(**data))
+def city_row(record: dict[str, Any]) -> CityRow:
+    """Build a cities row from a record."""
+    return (
+        str(record["name"]).strip(),
+        float(record["latitude"]),
+        float(record["longitude"]),
+    )
 
-        session.commit()
 
-    print(f"Seeded {len(CITIES_DATA)} cities")
-    print(f"Seeded {len(WEATHER_CODES_DATA)} weather codes")
+def weather_code_row(record: dict[str, Any]) -> WeatherCodeRow:
+    """Build a weather_codes row from a record."""
+    return int(record["code"]), str(record["description"]).strip()
+
+
+def report(table: str, result: SyncResult) -> None:
+    """Print the row counts of one table sync."""
+    print(
+        f"{table}: {result.inserted} inserted, {result.updated} updated, "
+        f"{result.deleted} deleted, {result.unchanged} unchanged"
+    )
+
+
+def main() -> None:
+    """Run database seeding."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cities", type=Path, help="CSV/JSON/JSONL file of cities")
+    parser.add_argument(
+        "--weather-codes", type=Path, help="CSV/JSON/JSONL file of weather codes"
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Delete rows that are not in the input (deleted cities lose history)",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Report counts and roll back"
+    )
+    args = parser.parse_args()
+
+    if args.cities is not None:
+        cities = convert(read_records(args.cities), city_row, str(args.cities))
+    else:
+        cities = convert(CITIES_DATA, city_row, "built-in cities")
+    if args.weather_codes is not None:
+        codes = convert(
+            read_records(args.weather_codes),
+            weather_code_row,
+            str(args.weather_codes),
+        )
+    else:
+        codes = convert(WEATHER_CODES_DATA, weather_code_row, "built-in codes")
+
+    settings = get_settings()
+    prune = args.prune
+    with Session(get_engine(settings)) as session:
+        repository = Repository(session)
+        # Codes first: they are small, so bad input fails before the big load
+        report("weather_codes", repository.sync_weather_codes(codes, prune=prune))
+        report("cities", repository.sync_cities(cities, prune=prune))
+        if args.dry_run:
+            session.rollback()
+            print("Dry run: rolled back")
+        else:
+            session.commit()
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""End-to-end tests against a running app and database."""
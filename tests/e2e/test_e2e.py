@@ -18,3 +18,14 @@ def test_user_can_get_weather_for_city(test_page: Page) -> None:
     expect(test_page.locator("article")).to_be_visible()
     expect(test_page.locator("article")).to_contain_text("Praha")
     expect(test_page.locator("article")).to_contain_text("°C")
+
+
+def test_api_weather_reports_each_city(app_url: str, page: Page) -> None:
+    """Batch endpoint returns weather per city and flags unknown ones."""
+    response = page.request.get(f"{app_url}/api/weather?cities=Praha,Brno,Atlantis")
+    expect(response).to_be_ok()
+
+    results = {r["city"]: r for r in response.json()["results"]}
+    assert "temperature" in results["Praha"]["weather"]
+    assert "temperature" in results["Brno"]["weather"]
+    assert results["Atlantis"]["error"] == "Unknown city."
@@ -0,0 +1 @@
+"""Unit tests that need neither a database nor a browser."""
@@ -0,0 +1,70 @@
+"""Tests for the upstream concurrency limiter and the in-memory rate limiter."""
+
+import threading
+
+import pytest
+
+from app.services import ConcurrencyLimiter, MemoryRateLimiter
+
+
+def test_limiter_sheds_calls_beyond_the_queue() -> None:
+    """With every slot taken and no queue, acquire fails at once."""
+    limiter = ConcurrencyLimiter(max_in_flight=2, max_queue=0, queue_timeout=10)
+    assert limiter.acquire()
+    assert limiter.acquire()
+
+    assert not limiter.acquire()
+    assert limiter.in_flight == 2
+
+
+def test_queued_call_gets_a_released_slot() -> None:
+    """A waiting call is admitted as soon as another call releases."""
+    limiter = ConcurrencyLimiter(max_in_flight=1, max_queue=1, queue_timeout=10)
+    assert limiter.acquire()
+    admitted: list[bool] = []
+    waiter = threading.Thread(target=lambda: admitted.append(limiter.acquire()))
+    waiter.start()
+    while limiter.waiting == 0:
+        threading.Event().wait(0.001)
+
+    limiter.release()
+    waiter.join()
+    assert admitted == [True]
+    assert limiter.in_flight == 1
+    assert limiter.waiting == 0
+
+
+def test_queued_call_gives_up_after_the_timeout() -> None:
+    """A call that waits longer than queue_timeout is shed."""
+    limiter = ConcurrencyLimiter(max_in_flight=1, max_queue=1, queue_timeout=0.05)
+    assert limiter.acquire()
+
+    assert not limiter.acquire()
+    assert limiter.waiting == 0
+
+
+def test_try_acquire_never_queues() -> None:
+    """try_acquire takes a free slot or fails, even with room in the queue."""
+    limiter = ConcurrencyLimiter(max_in_flight=1, max_queue=5, queue_timeout=10)
+    assert limiter.try_acquire()
+
+    assert not limiter.try_acquire()
+    limiter.release()
+    assert limiter.try_acquire()
+
+
+def test_rate_limiter_admits_a_burst_then_asks_to_wait() -> None:
+    """A full bucket admits burst requests; the next one waits for a token."""
+    limiter = MemoryRateLimiter(rate=1.0, burst=3)
+    assert [limiter.take("client") for _ in range(3)] == [0.0, 0.0, 0.0]
+
+    assert limiter.take("client") == pytest.approx(1.0, abs=0.01)
+
+
+def test_rate_limiter_buckets_are_per_client() -> None:
+    """One client using up its bucket does not limit another."""
+    limiter = MemoryRateLimiter(rate=1.0, burst=1)
+    assert limiter.take("a") == 0.0
+    assert limiter.take("a") > 0
+
+    assert limiter.take("b") == 0.0
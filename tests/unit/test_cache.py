@@ -0,0 +1,206 @@
+"""Tests for TTLCache freshness, fallback and single-flight loading."""
+
+import threading
+import time
+from collections.abc import Callable
+
+import pytest
+
+from app.services import TTLCache
+
+Key = tuple[float, float]
+
+PRAHA: Key = (50.08, 14.44)
+BRNO: Key = (49.2, 16.61)
+
+
+class Failed(Exception):
+    """Per-key load failure used by the tests."""
+
+
+def run(target: Callable[[], object]) -> tuple[threading.Thread, list[object]]:
+    """Start target in a thread; its result or exception lands in the list."""
+    outcome: list[object] = []
+
+    def wrapper() -> None:
+        try:
+            outcome.append(target())
+        except Exception as e:
+            outcome.append(e)
+
+    thread = threading.Thread(target=wrapper)
+    thread.start()
+    return thread, outcome
+
+
+def wait_for_flight(cache: TTLCache[str], key: Key) -> None:
+    """Block until a load for key is registered, so the next caller joins it."""
+    while key not in cache._flights:
+        threading.Event().wait(0.001)
+
+
+def store_aged(cache: TTLCache[str], key: Key, value: str, age: float) -> None:
+    """Store value as if it had been cached age seconds ago."""
+    cache.backend.set(key, value, time.time() - age)
+
+
+def test_concurrent_misses_run_the_loader_once() -> None:
+    """Callers missing the same key share one load and its result."""
+    cache: TTLCache[str] = TTLCache("test", ttl=60, max_size=10)
+    release = threading.Event()
+    calls = 0
+
+    def load() -> str:
+        nonlocal calls
+        calls += 1
+        release.wait()
+        return "sunny"
+
+    first, first_outcome = run(lambda: cache.get_or_load(PRAHA, load))
+    wait_for_flight(cache, PRAHA)
+    others = [run(lambda: cache.get_or_load(PRAHA, load)) for _ in range(5)]
+    while cache.stats().coalesced < 5:
+        threading.Event().wait(0.001)
+    release.set()
+    first.join()
+    for thread, _ in others:
+        thread.join()
+
+    assert calls == 1
+    assert first_outcome == ["sunny"]
+    assert all(outcome == ["sunny"] for _, outcome in others)
+    assert cache.get(PRAHA) == "sunny"
+
+
+def test_failed_load_is_not_cached() -> None:
+    """A loader error reaches the caller and the next call loads again."""
+    cache: TTLCache[str] = TTLCache("test", ttl=60, max_size=10)
+
+    def fail() -> str:
+        raise Failed("upstream down")
+
+    with pytest.raises(Failed):
+        cache.get_or_load(PRAHA, fail)
+    assert cache.get_or_load(PRAHA, lambda: "sunny") == "sunny"
+
+
+def test_expired_entry_is_reloaded() -> None:
+    """Entries older than the TTL (and any stale window) are a miss."""
+    cache: TTLCache[str] = TTLCache("test", ttl=60, max_size=10)
+    store_aged(cache, PRAHA, "old", age=61)
+
+    assert cache.get(PRAHA) is None
+    assert cache.get_or_load(PRAHA, lambda: "new") == "new"
+
+
+def test_stale_entry_is_served_while_revalidating() -> None:
+    """Within max_stale the old value is returned and reloaded in the background."""
+    cache: TTLCache[str] = TTLCache("test", ttl=60, max_size=10, max_stale=60)
+    store_aged(cache, PRAHA, "old", age=90)
+    reloaded = threading.Event()
+
+    def load() -> str:
+        reloaded.set()
+        return "new"
+
+    assert cache.get_or_load(PRAHA, load) == "old"
+    assert reloaded.wait(1)
+    while PRAHA in cache._flights:
+        threading.Event().wait(0.001)
+    assert cache.get(PRAHA) == "new"
+    assert cache.stats().stale == 1
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    """The in-process backend keeps max_size entries, dropping the oldest use."""
+    cache: TTLCache[str] = TTLCache("test", ttl=60, max_size=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+
+
+def test_last_known_good_is_bounded_by_max_fallback_age() -> None:
+    """Expired entries serve as fallbacks only up to max_fallback_age old."""
+    cache: TTLCache[str] = TTLCache("test", ttl=60, max_size=10, max_fallback_age=600)
+    store_aged(cache, PRAHA, "recent", age=300)
+    store_aged(cache, BRNO, "ancient", age=900)
+
+    assert cache.last_known_good(PRAHA) == "recent"
+    assert cache.last_known_good(BRNO) is None
+    assert cache.stats().fallback == 1
+
+
+def test_expires_in_follows_the_oldest_entry() -> None:
+    """Remaining freshness is that of the oldest key, zero if any is missing."""
+    cache: TTLCache[str] = TTLCache("test", ttl=60, max_size=10)
+    store_aged(cache, PRAHA, "sunny", age=10)
+    store_aged(cache, BRNO, "rainy", age=40)
+
+    assert cache.expires_in([PRAHA, BRNO]) == pytest.approx(20, abs=1)
+    assert cache.expires_in([PRAHA, (0.0, 0.0)]) == 0.0
+
+
+def test_single_key_caller_gets_failure_of_joined_batch_load() -> None:
+    """A get_or_load waiting on a batch raises the batch's per-key failure."""
+    cache: TTLCache[str] = TTLCache("test", ttl=60, max_size=10)
+    release = threading.Event()
+    failure = Failed("Praha failed")
+
+    def load_batch(keys: list[Key]) -> dict[Key, str | Failed]:
+        release.wait()
+        return {k: failure if k == PRAHA else "sunny" for k in keys}
+
+    batch, batch_outcome = run(
+        lambda: cache.get_or_load_many([PRAHA, BRNO], load_batch)
+    )
+    wait_for_flight(cache, PRAHA)
+    single, single_outcome = run(lambda: cache.get_or_load(PRAHA, lambda: "unused"))
+    release.set()
+    batch.join()
+    single.join()
+
+    assert batch_outcome == [{PRAHA: failure, BRNO: "sunny"}]
+    assert single_outcome == [failure]
+    assert cache.stats().coalesced == 1
+
+
+def test_batch_reports_failure_of_joined_single_key_load_per_key() -> None:
+    """A batch waiting on a failing get_or_load reports it for that key only."""
+    cache: TTLCache[str] = TTLCache("test", ttl=60, max_size=10)
+    release = threading.Event()
+    failure = Failed("Praha failed")
+
+    def load_one() -> str:
+        release.wait()
+        raise failure
+
+    single, single_outcome = run(lambda: cache.get_or_load(PRAHA, load_one))
+    wait_for_flight(cache, PRAHA)
+    batch, batch_outcome = run(
+        lambda: cache.get_or_load_many(
+            [PRAHA, BRNO], lambda keys: dict.fromkeys(keys, "sunny")
+        )
+    )
+    release.set()
+    single.join()
+    batch.join()
+
+    assert single_outcome == [failure]
+    assert batch_outcome == [{PRAHA: failure, BRNO: "sunny"}]
+
+
+def test_batch_loader_exception_propagates_to_its_caller() -> None:
+    """An exception raised by the batch's own loader is not swallowed."""
+    cache: TTLCache[str] = TTLCache("test", ttl=60, max_size=10)
+
+    def load_batch(keys: list[Key]) -> dict[Key, str]:
+        raise Failed("upstream down")
+
+    with pytest.raises(Failed):
+        cache.get_or_load_many([PRAHA], load_batch)
+    assert not cache._flights
@@ -0,0 +1,230 @@
+"""Tests for the shared-memory and Redis cache backends."""
+
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from app.services import Codec, MmapBackend, RedisBackend
+
+TEXT = Codec(str.encode, bytes.decode)
+
+
+class FakeRedis:
+    """The subset of the redis-py client RedisBackend uses, kept in a dict."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+        self.expiry: dict[str, int] = {}
+        self.locks: set[str] = set()
+
+    def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [self.data.get(k) for k in keys]
+
+    def set(self, key: str, value: bytes, ex: int) -> None:
+        self.data[key] = value
+        self.expiry[key] = ex
+
+    def pipeline(self, transaction: bool) -> "FakePipeline":
+        return FakePipeline(self)
+
+    def scan_iter(self, match: str, count: int) -> Iterator[str]:
+        prefix = match.rstrip("*")
+        return iter([k for k in self.data if k.startswith(prefix)])
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.data.pop(key, None)
+
+    def lock(self, name: str, timeout: float, blocking_timeout: float) -> "FakeLock":
+        return FakeLock(self, name)
+
+
+class FakePipeline:
+    """Buffers set calls until execute, like a non-transactional pipeline."""
+
+    def __init__(self, client: FakeRedis) -> None:
+        self.client = client
+        self.commands: list[tuple[str, bytes, int]] = []
+
+    def __enter__(self) -> "FakePipeline":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+    def set(self, key: str, value: bytes, ex: int) -> None:
+        self.commands.append((key, value, ex))
+
+    def execute(self) -> None:
+        for command in self.commands:
+            self.client.set(*command)
+
+
+class FakeLock:
+    """Non-blocking lock on a name in the fake client."""
+
+    def __init__(self, client: FakeRedis, name: str) -> None:
+        self.client = client
+        self.name = name
+
+    def acquire(self) -> bool:
+        if self.name in self.client.locks:
+            return False
+        self.client.locks.add(self.name)
+        return True
+
+    def release(self) -> None:
+        self.client.locks.discard(self.name)
+
+
+class BrokenRedis:
+    """Client whose every command fails, as when Redis is unreachable."""
+
+    def __getattr__(self, name: str) -> Any:
+        def fail(*args: object, **kwargs: object) -> None:
+            raise ConnectionError("Redis is down")
+
+        return fail
+
+    def lock(self, name: str, timeout: float, blocking_timeout: float) -> Any:
+        # Creating a redis-py lock sends nothing; acquiring it fails
+        return self
+
+
+def mmap_backend(path: Path, slots: int = 64) -> MmapBackend[str]:
+    """Mmap backend over a file in the test's temporary directory."""
+    return MmapBackend(str(path / "weather.cache"), TEXT, slots=slots)
+
+
+def redis_backend(client: object) -> RedisBackend[str]:
+    """Redis backend using the given fake client."""
+    return RedisBackend(client, "weather", TEXT, retention=3600)  # type: ignore[arg-type]
+
+
+def test_mmap_entries_are_shared_between_mappings(tmp_path: Path) -> None:
+    """A value written through one mapping is read through another."""
+    writer = mmap_backend(tmp_path)
+    reader = mmap_backend(tmp_path)
+    writer.set((50.08, 14.44), "sunny", 1000.0)
+
+    assert reader.get((50.08, 14.44)) == (1000.0, "sunny")
+    assert reader.get((49.2, 16.61)) is None
+    assert len(reader) == 1
+
+
+def test_mmap_skips_values_larger_than_a_slot(tmp_path: Path) -> None:
+    """Values that do not fit a slot are not cached instead of corrupting it."""
+    backend = mmap_backend(tmp_path)
+    backend.set("key", "x" * 1000, 1000.0)
+
+    assert backend.get("key") is None
+
+
+def test_mmap_clear_drops_every_entry(tmp_path: Path) -> None:
+    """clear empties the table for every process mapping it."""
+    backend = mmap_backend(tmp_path)
+    backend.set_many({"a": "1", "b": "2"}, 1000.0)
+    backend.clear()
+
+    assert mmap_backend(tmp_path).get_many(["a", "b"]) == {}
+
+
+def test_mmap_resets_a_file_with_another_layout(tmp_path: Path) -> None:
+    """Opening the file with a different table size starts from empty."""
+    mmap_backend(tmp_path, slots=64).set("a", "1", 1000.0)
+
+    assert mmap_backend(tmp_path, slots=128).get("a") is None
+
+
+def test_mmap_lock_is_exclusive(tmp_path: Path) -> None:
+    """A second holder waits until the first releases the named lock."""
+    first, second = mmap_backend(tmp_path), mmap_backend(tmp_path)
+    released = threading.Event()
+    order: list[str] = []
+
+    def hold() -> None:
+        with first.lock("refresh", timeout=5):
+            order.append("first")
+            released.wait()
+        order.append("released")
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    while not order:
+        threading.Event().wait(0.001)
+    threading.Timer(0.1, released.set).start()
+    with second.lock("refresh", timeout=5):
+        order.append("second")
+    holder.join()
+
+    assert order == ["first", "released", "second"]
+
+
+def test_mmap_lock_proceeds_without_it_after_the_timeout(tmp_path: Path) -> None:
+    """A holder that never releases delays others only up to their timeout."""
+    first, second = mmap_backend(tmp_path), mmap_backend(tmp_path)
+
+    with first.lock("refresh", timeout=5):
+        started = time.monotonic()
+        with second.lock("refresh", timeout=0.1):
+            waited = time.monotonic() - started
+
+    assert 0.1 <= waited < 1
+
+
+def test_redis_round_trip_with_retention() -> None:
+    """Entries keep their timestamp and are written with the retention as TTL."""
+    client = FakeRedis()
+    backend = redis_backend(client)
+    backend.set_many({"a": "1", "b": "2"}, 1000.0)
+
+    assert backend.get_many(["a", "b", "c"]) == {"a": (1000.0, "1"), "b": (1000.0, "2")}
+    assert set(client.expiry.values()) == {3600}
+
+
+def test_redis_clear_removes_only_its_own_keys() -> None:
+    """clear deletes this cache's keys and leaves other data alone."""
+    client = FakeRedis()
+    client.data["other:key"] = b"kept"
+    backend = redis_backend(client)
+    backend.set("a", "1", 1000.0)
+    backend.clear()
+
+    assert backend.get("a") is None
+    assert len(backend) == 0
+    assert client.data == {"other:key": b"kept"}
+
+
+def test_redis_lock_is_released() -> None:
+    """The named lock is held inside the block and released after it."""
+    client = FakeRedis()
+    backend = redis_backend(client)
+
+    with backend.lock("refresh", timeout=5):
+        assert client.locks == {"czech-weather:weather:lock:refresh"}
+    assert client.locks == set()
+
+
+def test_unavailable_redis_degrades_to_misses() -> None:
+    """Redis errors are logged, never raised: reads miss and writes are dropped."""
+    backend = redis_backend(BrokenRedis())
+    backend.set("a", "1", 1000.0)
+
+    assert backend.get("a") is None
+    assert len(backend) == 0
+    backend.clear()
+    with backend.lock("refresh", timeout=5):
+        pass
+
+
+@pytest.mark.parametrize("name", ["mmap", "redis"])
+def test_backends_report_missing_keys_as_absent(name: str, tmp_path: Path) -> None:
+    """get_many only returns the keys that are stored."""
+    backend = mmap_backend(tmp_path) if name == "mmap" else redis_backend(FakeRedis())
+    backend.set("a", "1", 1000.0)
+
+    assert backend.get_many(["a", "missing"]) == {"a": (1000.0, "1")}
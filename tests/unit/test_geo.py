@@ -0,0 +1,60 @@
+"""Tests for the nearest-city k-d tree."""
+
+import random
+
+import pytest
+
+from app.models import City
+from app.services import CityIndex
+from app.services.geo import haversine_km
+
+
+def city(id: int, name: str, latitude: float, longitude: float) -> City:
+    """A city with the given id and position."""
+    return City(id=id, name=name, latitude=latitude, longitude=longitude)
+
+
+def test_nearest_matches_brute_force() -> None:
+    """The tree finds the same city as checking every distance."""
+    rng = random.Random(42)
+    cities = [
+        city(i, f"City {i}", rng.uniform(48.5, 51.1), rng.uniform(12.1, 18.9))
+        for i in range(500)
+    ]
+    index = CityIndex(cities)
+
+    for _ in range(200):
+        latitude, longitude = rng.uniform(48, 52), rng.uniform(11, 20)
+        expected = min(
+            cities,
+            key=lambda c: haversine_km(latitude, longitude, c.latitude, c.longitude),
+        )
+        found = index.nearest(latitude, longitude)
+        assert found is not None
+        assert found[0].id == expected.id
+
+
+def test_nearest_reports_great_circle_distance() -> None:
+    """The distance returned is in kilometres (Praha to Brno is ~185 km)."""
+    index = CityIndex([city(1, "Praha", 50.0755, 14.4378)])
+
+    found = index.nearest(49.1951, 16.6068)
+    assert found is not None
+    assert found[1] == pytest.approx(185, abs=2)
+
+
+def test_nearest_works_across_the_antimeridian() -> None:
+    """Longitudes 179.9 and -179.9 are neighbours, not half a world apart."""
+    index = CityIndex([city(1, "East", 0.0, 179.9), city(2, "West", 0.0, 0.0)])
+
+    found = index.nearest(0.0, -179.9)
+    assert found is not None
+    assert found[0].name == "East"
+
+
+def test_empty_index_finds_nothing() -> None:
+    """An index without cities returns None."""
+    index = CityIndex([])
+
+    assert len(index) == 0
+    assert index.nearest(50.0, 14.0) is None
@@ -0,0 +1,169 @@
+"""Tests for the circuit breaker and the upstream call policy."""
+
+import threading
+
+import httpx
+import pytest
+
+from app.services import CircuitBreaker, CircuitOpenError, UpstreamPolicy
+from app.services.resilience import RetryPolicy
+
+
+def no_retries() -> RetryPolicy:
+    """Retry policy that gives up after the first attempt."""
+    return RetryPolicy(retries=0, backoff=0.0, backoff_max=0.0, budget=10.0)
+
+
+def server_error() -> httpx.HTTPStatusError:
+    """A transient upstream error (HTTP 503)."""
+    request = httpx.Request("GET", "https://api.open-meteo.com/v1/forecast")
+    response = httpx.Response(503, request=request)
+    return httpx.HTTPStatusError("unavailable", request=request, response=response)
+
+
+def test_circuit_opens_after_consecutive_failures() -> None:
+    """The threshold-th failure in a row opens the circuit; a success resets."""
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_success(0.1)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow() is None
+
+
+def test_half_open_circuit_admits_a_single_probe() -> None:
+    """After the reset timeout one probe goes through; its success closes."""
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.allow() == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() is None
+    breaker.record_success(0.1, probe=True)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_probe_opens_the_circuit_again() -> None:
+    """A probe failure reopens the circuit and restarts the reset timeout."""
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    breaker.reset_timeout = 0
+    assert breaker.allow() == CircuitBreaker.HALF_OPEN
+
+    breaker.reset_timeout = 60
+    breaker.record_failure(probe=True)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_slow_call_counts_as_failure() -> None:
+    """A call slower than slow_call_threshold counts toward opening."""
+    breaker = CircuitBreaker(
+        "test", failure_threshold=1, reset_timeout=60, slow_call_threshold=1.0
+    )
+    breaker.record_success(0.5)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_success(2.0)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_latency_quantile_needs_enough_samples() -> None:
+    """No quantile is reported until enough successful calls were seen."""
+    breaker = CircuitBreaker("test", failure_threshold=5, reset_timeout=60)
+    breaker.record_success(0.1)
+    assert breaker.latency_quantile(0.95) is None
+
+    for _ in range(95):
+        breaker.record_success(0.1)
+    for _ in range(5):
+        breaker.record_success(3.0)
+    assert breaker.latency_quantile(0.5) == 0.1
+    assert breaker.latency_quantile(0.99) == 3.0
+
+
+def test_policy_retries_transient_errors() -> None:
+    """A 5xx is retried and the later success returned."""
+    policy = UpstreamPolicy(
+        CircuitBreaker("test", failure_threshold=5, reset_timeout=60),
+        RetryPolicy(retries=2, backoff=0.0, backoff_max=0.0, budget=10.0),
+    )
+    attempts = 0
+
+    def flaky() -> str:
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise server_error()
+        return "ok"
+
+    assert policy.call(flaky) == "ok"
+    assert attempts == 3
+
+
+def test_policy_does_not_retry_bad_requests() -> None:
+    """Errors that are not transient propagate at once and keep the circuit closed."""
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=60)
+    policy = UpstreamPolicy(breaker, no_retries())
+
+    def bad_request() -> str:
+        raise ValueError("bad coordinates")
+
+    with pytest.raises(ValueError):
+        policy.call(bad_request)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_policy_rejects_calls_while_open() -> None:
+    """An open circuit fails fast without calling the upstream."""
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    policy = UpstreamPolicy(breaker, no_retries())
+
+    with pytest.raises(CircuitOpenError):
+        policy.call(lambda: pytest.fail("upstream called"))
+
+
+def test_interrupted_probe_frees_the_probe_slot() -> None:
+    """A probe ending without an outcome does not leave the circuit stuck."""
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    policy = UpstreamPolicy(breaker, no_retries())
+
+    def interrupted() -> str:
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        policy.call(interrupted)
+    assert policy.call(lambda: "ok") == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_call_admitted_while_closed_keeps_another_threads_probe() -> None:
+    """Only the probe frees the probe slot, not calls that started earlier."""
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=60)
+    policy = UpstreamPolicy(breaker, no_retries())
+    started = threading.Event()
+    release = threading.Event()
+
+    def interrupted() -> str:
+        started.set()
+        release.wait()
+        raise KeyboardInterrupt
+
+    def early_call() -> None:
+        with pytest.raises(KeyboardInterrupt):
+            policy.call(interrupted)
+
+    early = threading.Thread(target=early_call)
+    early.start()
+    started.wait()
+    breaker.record_failure()
+    breaker.reset_timeout = 0
+    assert breaker.allow() == CircuitBreaker.HALF_OPEN
+
+    breaker.reset_timeout = 60
+    release.set()
+    early.join()
+    assert breaker.allow() is None
@@ -0,0 +1,66 @@
+"""Tests for the in-memory city name search."""
+
+from app.models import City
+from app.services import CitySearchIndex
+
+NAMES = [
+    "Praha",
+    "Brno",
+    "Ostrava",
+    "Olomouc",
+    "České Budějovice",
+    "Budyně nad Ohří",
+    "Nové Město na Moravě",
+    "Nové Město nad Metují",
+]
+
+
+def index() -> CitySearchIndex:
+    """Search index over a handful of Czech cities."""
+    return CitySearchIndex(
+        [
+            City(id=i, name=name, latitude=50.0, longitude=15.0)
+            for i, name in enumerate(NAMES, 1)
+        ]
+    )
+
+
+def names(cities: list[City]) -> list[str]:
+    """Names of the found cities, in order."""
+    return [c.name for c in cities]
+
+
+def test_prefix_ignores_case_and_diacritics() -> None:
+    """Queries are folded like names, so "ceske" finds "České Budějovice"."""
+    assert names(index().search("ceske")) == ["České Budějovice"]
+    assert names(index().search("PRA")) == ["Praha"]
+
+
+def test_whole_name_matches_come_before_later_words() -> None:
+    """Names starting with the query rank above names with a later word matching."""
+    assert names(index().search("bud")) == ["Budyně nad Ohří", "České Budějovice"]
+
+
+def test_multi_word_prefix_is_alphabetical() -> None:
+    """Several whole-name matches are returned in alphabetical order."""
+    assert names(index().search("nove mesto na")) == [
+        "Nové Město na Moravě",
+        "Nové Město nad Metují",
+    ]
+
+
+def test_typo_falls_back_to_similarity() -> None:
+    """A query no name starts with finds names with similar trigrams."""
+    assert names(index().search("olomuc")) == ["Olomouc"]
+
+
+def test_similarity_is_not_mixed_into_prefix_matches() -> None:
+    """Fuzzy matches are only returned when nothing matches the prefix."""
+    assert names(index().search("ostr")) == ["Ostrava"]
+
+
+def test_limit_and_empty_query() -> None:
+    """At most limit cities are returned, and a blank query finds none."""
+    assert len(index().search("n", limit=1)) == 1
+    assert index().search("   ") == []
+    assert index().search("praha", limit=0) == []